@@ -1,55 +1,371 @@
-from flask import Flask, request, jsonify
-import whisper
-import requests
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 import tempfile
+import json
 import os
+import time
+from audio_io import decode_audio_bytes
+from audio_io import RAW_PCM_MIMETYPES, WHISPER_SAMPLE_RATE
+from batch_transcribe import BATCH_SIZE, transcribe_files
+from metrics import CONTENT_TYPE, RTF_BUCKETS, StageTimer, registry as metrics
+from ollama_client import get_client
+from response_cache import answer_key, audio_key, get_cache, get_transcript_cache
+import transcriber
+from transcription_pool import TRANSCRIBE_WORKERS, PoolBusyError, TranscriptionPool
+
+# Backend, model size, device, compute type and threads come from WHISPER_* (see transcriber.py)
+WHISPER_WARM_UP = os.environ.get('WHISPER_WARM_UP', '1') == '1'
+# Requests served at once by the HTTP server; transcription itself is capped by
+# TRANSCRIBE_WORKERS and the rest wait up to TRANSCRIBE_QUEUE_TIMEOUT (then 503)
+ASK_MAX_CONCURRENCY = int(os.environ.get('ASK_MAX_CONCURRENCY', '16'))
+ASK_HOST = os.environ.get('ASK_HOST', '0.0.0.0')
+ASK_PORT = int(os.environ.get('ASK_PORT', '5000'))
+ASK_DEV_SERVER = os.environ.get('ASK_DEV_SERVER', '0') == '1'
 
 app = Flask(__name__)
 
-@app.route('/ask', methods=['POST'])
-def ask():
+# Set in __main__ when TRANSCRIBE_WORKERS > 0; otherwise requests transcribe in-process
+pool = None
+# Print one JSON line with the stage timings of every request
+ASK_LOG_TIMINGS = os.environ.get('ASK_LOG_TIMINGS', '1') == '1'
+
+# -------------------------------
+# METRICS (GET /metrics)
+# -------------------------------
+STAGE_SECONDS = metrics.histogram('ask_stage_seconds', 'Time per request stage', ['stage'])
+REQUESTS = metrics.counter('ask_requests_total', 'Requests by endpoint and status', ['endpoint', 'status'])
+IN_FLIGHT = metrics.gauge('ask_in_flight_requests', 'Requests being served')
+TRANSCRIPTION_SECONDS = metrics.histogram('whisper_transcription_seconds', 'Whisper time per upload')
+AUDIO_SECONDS = metrics.histogram('whisper_audio_seconds', 'Audio length per transcribed upload',
+                                  buckets=(1, 2, 5, 10, 15, 30, 60, 120, 300))
+REALTIME_FACTOR = metrics.histogram('whisper_realtime_factor',
+                                    'Transcription seconds per second of audio', buckets=RTF_BUCKETS)
+OLLAMA_PROMPT_EVAL = metrics.histogram('ollama_prompt_eval_seconds', 'prompt_eval_duration reported by Ollama')
+OLLAMA_EVAL = metrics.histogram('ollama_eval_seconds', 'eval_duration reported by Ollama')
+QUEUE_DEPTH = metrics.gauge('transcribe_queue_depth', 'Requests waiting for a Whisper worker')
+QUEUE_DEPTH.set_function(lambda: pool.waiting if pool else 0)
+BUSY_WORKERS = metrics.gauge('transcribe_busy_workers', 'Whisper workers transcribing right now')
+BUSY_WORKERS.set_function(lambda: pool.busy if pool else 0)
+
+
+def observe_transcription(seconds, audio, result):
+    TRANSCRIPTION_SECONDS.observe(seconds)
+    if audio is not None:
+        duration = len(audio) / WHISPER_SAMPLE_RATE
+    else:
+        # Decoded by ffmpeg inside Whisper; the last segment end is close enough
+        segments = result.get('segments') or []
+        duration = segments[-1]['end'] if segments else 0
+    if duration > 0:
+        AUDIO_SECONDS.observe(duration)
+        REALTIME_FACTOR.observe(seconds / duration)
+
+
+def observe_ollama(data):
+    """Record the durations (nanoseconds) Ollama reports in its final response."""
+    if data.get('prompt_eval_duration'):
+        OLLAMA_PROMPT_EVAL.observe(data['prompt_eval_duration'] / 1e9)
+    if data.get('eval_duration'):
+        OLLAMA_EVAL.observe(data['eval_duration'] / 1e9)
+
+
+@app.before_request
+def start_timer():
+    g.timer = StageTimer(STAGE_SECONDS)
+    IN_FLIGHT.inc()
+
+
+@app.after_request
+def count_request(response):
+    g.status = response.status_code
+    REQUESTS.inc(endpoint=request.endpoint or 'unknown', status=response.status_code)
+    return response
+
+
+@app.teardown_request
+def finish_timer(exc):
+    # For streamed responses this runs once the stream is finished
+    IN_FLIGHT.dec()
+    timer = g.get('timer')
+    if ASK_LOG_TIMINGS and timer and timer.stages:
+        print(json.dumps({'endpoint': request.endpoint, 'status': g.get('status'),
+                          'timings_ms': timer.as_dict()}))
+
+
+class AskError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def transcribe_request():
+    """Validate the /ask form and return (question, language)."""
     # Get language from form (default to English)
     lang = request.form.get('language', 'en')
     if lang not in ['en', 'hi']:
-        return jsonify({'error': 'Invalid language'}), 400
+        raise AskError('Invalid language')
 
     # Get audio file
     if 'audio' not in request.files:
-        return jsonify({'error': 'No audio file uploaded'}), 400
+        raise AskError('No audio file uploaded')
     audio_file = request.files['audio']
 
-    # Save to temp file
-    with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as tmpfile:
-        audio_file.save(tmpfile.name)
-        temp_path = tmpfile.name
+    with g.timer.stage('upload'):
+        data = audio_file.stream.read()
+    model = pool or transcriber.get_transcriber()
+    text = transcribe_upload(model, data, audio_file.mimetype, audio_file.mimetype_params,
+                             request.form.get('sample_rate'), audio_file.filename, lang, g.timer)
 
+    question = text.strip()
+    if len(question) < 3:
+        raise AskError('Transcription too short or unclear.')
+    return question, lang
+
+
+def transcribe_upload(model, data, mimetype, params, sample_rate, filename, lang, timer=None):
+    """Return the transcript of uploaded bytes, reusing it for audio seen before.
+
+    A retry with identical bytes costs one hash and no decode; the same audio
+    re-encoded into another WAV layout is still caught by the decoded-PCM hash.
+    """
+    timer = timer or StageTimer()
+    cache = get_transcript_cache()
+    model_name = transcriber.model_id()
+    layout = None
+    if (mimetype or '').lower() in RAW_PCM_MIMETYPES:
+        # Headerless PCM means whatever its mimetype, rate and channels say
+        params = params or {}
+        layout = [mimetype.lower(), params.get('rate'), params.get('channels'), sample_rate]
+    raw_key = audio_key('raw', data, lang, model_name, layout)
+    text = cache.get(raw_key)
+    if text is not None:
+        return text
+
+    # PCM/WAV at 16 kHz is decoded in memory and handed straight to Whisper
     try:
-        # Transcribe
-        model = whisper.load_model('base')
-        result = model.transcribe(temp_path, language=lang)
-        question = result['text'].strip()
-        if len(question) < 3:
-            return jsonify({'error': 'Transcription too short or unclear.'}), 400
+        with timer.stage('decode'):
+            audio = decode_audio_bytes(data, mimetype, params, sample_rate)
+    except ValueError as e:
+        raise AskError(str(e))
+    pcm_key = None
+    if audio is not None:
+        pcm_key = audio_key('pcm', audio.tobytes(), lang, model_name)
+        text = cache.get(pcm_key)
 
-        # Ask Gemma
-        ollama_url = 'http://localhost:11434/api/generate'
-        payload = {
-            'model': 'gemma:2b',
-            'prompt': f'Answer this question concisely: {question}',
-            'stream': False
-        }
-        response = requests.post(ollama_url, json=payload)
-        response.raise_for_status()
-        result = response.json()
-        answer = result.get('response', 'No response received')
-        return jsonify({'question': question, 'answer': answer})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    if text is None:
+        start = time.perf_counter()
+        try:
+            result = transcribe_audio(model, audio, data, filename, lang, timer)
+        except PoolBusyError as e:
+            raise AskError(str(e), status=503)
+        # Includes any wait for a free worker; the temp file write is timed on its own
+        seconds = time.perf_counter() - start - timer.stages.get('tempfile', 0.0)
+        timer.add('transcribe', seconds)
+        observe_transcription(seconds, audio, result)
+        text = result['text']
+        if pcm_key:
+            cache.put(pcm_key, text)
+    cache.put(raw_key, text)
+    return text
+
+
+def transcribe_audio(model, audio, data, filename, lang, timer=None):
+    """Run ``model`` (the worker pool or an in-process transcriber) on one upload."""
+    if audio is not None:
+        return model.transcribe(audio, language=lang)
+
+    # Compressed formats and odd sample rates still go through ffmpeg
+    suffix = os.path.splitext(filename or '')[1] or '.wav'
+    timer = timer or StageTimer()
+    with timer.stage('tempfile'), tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmpfile:
+        tmpfile.write(data)
+        temp_path = tmpfile.name
+
+    try:
+        return model.transcribe(temp_path, language=lang)
     finally:
         try:
             os.unlink(temp_path)
         except:
             pass
 
+
+PROMPT_TEMPLATE = 'Answer this question concisely: {question}'
+
+
+def build_prompt(question):
+    return PROMPT_TEMPLATE.format(question=question)
+
+
+def cached_answer_key(question, client):
+    """Cache key for Gemma's answer to ``question`` under the current prompt and model."""
+    return answer_key(question, PROMPT_TEMPLATE, client.model)
+
+
+@app.route('/ask', methods=['POST'])
+def ask():
+    try:
+        question, _ = transcribe_request()
+
+        # Repeated questions are answered from the cache
+        client = get_client()
+        key = cached_answer_key(question, client)
+        answer = get_cache().get(key)
+        if answer is not None:
+            return jsonify({'question': question, 'answer': answer, 'cached': True,
+                            'timings_ms': g.timer.as_dict()})
+
+        # Ask Gemma
+        with g.timer.stage('llm'):
+            result = client.generate(build_prompt(question))
+        observe_ollama(result)
+        answer = result.get('response')
+        if answer:
+            get_cache().put(key, answer)
+        return jsonify({'question': question, 'answer': answer or 'No response received',
+                        'timings_ms': g.timer.as_dict()})
+    except AskError as e:
+        return jsonify({'error': str(e), 'timings_ms': g.timer.as_dict()}), e.status
+    except Exception as e:
+        return jsonify({'error': str(e), 'timings_ms': g.timer.as_dict()}), 500
+
+
+@app.route('/ask/stream', methods=['POST'])
+def ask_stream():
+    """Same as /ask, but streams the answer as it is generated.
+
+    The response is NDJSON by default: one ``question`` event with the
+    transcription, one ``token`` event per Gemma chunk and a final ``done``
+    event. Send ``Accept: text/event-stream`` (or ``format=sse``) to get the
+    same events as Server-Sent Events instead.
+    """
+    use_sse = (request.form.get('format') == 'sse'
+               or request.accept_mimetypes.best == 'text/event-stream')
+
+    try:
+        question, _ = transcribe_request()
+    except AskError as e:
+        return jsonify({'error': str(e), 'timings_ms': g.timer.as_dict()}), e.status
+    except Exception as e:
+        return jsonify({'error': str(e), 'timings_ms': g.timer.as_dict()}), 500
+
+    def encode(event):
+        if use_sse:
+            return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        return json.dumps(event) + '\n'
+
+    def generate():
+        yield encode({'type': 'question', 'question': question})
+        client = get_client()
+        key = cached_answer_key(question, client)
+        cached = get_cache().get(key)
+        if cached is not None:
+            yield encode({'type': 'token', 'token': cached})
+            yield encode({'type': 'done', 'question': question, 'answer': cached, 'cached': True,
+                          'timings_ms': g.timer.as_dict()})
+            return
+
+        answer = ''
+        start = time.perf_counter()
+        try:
+            for data in client.stream_generate(build_prompt(question)):
+                piece = data.get('response', '')
+                if piece:
+                    if not answer:
+                        g.timer.add('llm_first_token', time.perf_counter() - start)
+                    answer += piece
+                    yield encode({'type': 'token', 'token': piece})
+                if data.get('done'):
+                    observe_ollama(data)
+            g.timer.add('llm', time.perf_counter() - start)
+            if answer:
+                get_cache().put(key, answer)
+            yield encode({'type': 'done', 'question': question, 'answer': answer,
+                          'timings_ms': g.timer.as_dict()})
+        except Exception as e:
+            # Headers are already sent, so errors travel in-band
+            yield encode({'type': 'error', 'error': str(e), 'timings_ms': g.timer.as_dict()})
+
+    mimetype = 'text/event-stream' if use_sse else 'application/x-ndjson'
+    # Ask proxies such as nginx not to buffer the stream
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    return Response(stream_with_context(generate()), mimetype=mimetype, headers=headers)
+
+
+@app.route('/transcribe/batch', methods=['POST'])
+def transcribe_batch():
+    """Transcribe every uploaded ``audio`` file in batched Whisper passes.
+
+    Streams NDJSON: one ``file`` event per upload (``text`` or ``error``), in
+    upload order, as soon as it is finished, then a ``done`` event.
+    """
+    lang = request.form.get('language') or None
+    if lang not in (None, 'en', 'hi'):
+        return jsonify({'error': 'Invalid language'}), 400
+    files = request.files.getlist('audio')
+    if not files:
+        return jsonify({'error': 'No audio files uploaded'}), 400
+    try:
+        batch_size = max(1, int(request.form.get('batch_size', BATCH_SIZE)))
+    except ValueError:
+        return jsonify({'error': 'Invalid batch_size'}), 400
+
+    # Read the uploads now: Flask closes them before the streamed body runs
+    sources = [(f.filename or f'audio{i}', f.stream.read()) for i, f in enumerate(files)]
+
+    def generate():
+        count = 0
+        try:
+            # Each batched pass takes one pool worker, like any other transcription
+            model = pool or transcriber.get_transcriber()
+            for result in transcribe_files(sources, lang, batch_size, model):
+                count += 1
+                yield json.dumps({'type': 'file', **result}) + '\n'
+            yield json.dumps({'type': 'done', 'files': count}) + '\n'
+        except Exception as e:
+            yield json.dumps({'type': 'error', 'error': str(e)}) + '\n'
+
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson', headers=headers)
+
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify({'answers': get_cache().stats(), 'transcripts': get_transcript_cache().stats()})
+
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    return Response(metrics.render(), content_type=CONTENT_TYPE)
+
+
+@app.route('/health', methods=['GET'])
+def health():
+    workers = pool.stats() if pool else []
+    ok = all(w['alive'] for w in workers)
+    return jsonify({'ok': ok, 'workers': workers}), 200 if ok else 503
+
+
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    if TRANSCRIBE_WORKERS > 0:
+        # Each worker process loads and warms up its own model at startup
+        pool = TranscriptionPool(TRANSCRIBE_WORKERS)
+        print(f"🎙️ Started {TRANSCRIBE_WORKERS} Whisper worker processes")
+    elif WHISPER_WARM_UP:
+        # Load in the background so the server starts accepting connections
+        # immediately; early requests wait on the same load instead of
+        # starting their own.
+        transcriber.warm_up_async()
+
+    try:
+        from waitress import serve
+    except ImportError:
+        serve = None
+        if not ASK_DEV_SERVER:
+            print("⚠️ waitress not installed (pip install waitress); using Flask's dev server")
+
+    if serve and not ASK_DEV_SERVER:
+        print(f"🚀 Serving on http://{ASK_HOST}:{ASK_PORT} ({ASK_MAX_CONCURRENCY} threads)")
+        serve(app, host=ASK_HOST, port=ASK_PORT, threads=ASK_MAX_CONCURRENCY)
+    else:
+        # The reloader would import this module twice and load the model twice
+        app.run(host=ASK_HOST, port=ASK_PORT, debug=True, use_reloader=False, threaded=True)
@@ -0,0 +1,244 @@
+"""ASGI variant of ask_api.py (Starlette + httpx).
+
+Same /ask, /ask/stream and /health endpoints, but the event loop never blocks:
+uploads are read asynchronously, decoding and transcription run in a thread
+pool sized to the transcription capacity, and Gemma is awaited over an async
+HTTP client. Requests that are only waiting on Ollama cost a coroutine rather
+than an OS thread, so one process can hold hundreds of them.
+
+Run with ``python ask_api_async.py`` or ``uvicorn ask_api_async:app``.
+Needs ``pip install starlette uvicorn httpx python-multipart``.
+"""
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from ask_api import (ASK_LOG_TIMINGS, BUSY_WORKERS, IN_FLIGHT, QUEUE_DEPTH, REQUESTS, STAGE_SECONDS,
+                     AskError, build_prompt, cached_answer_key, observe_ollama, transcribe_upload)
+from metrics import CONTENT_TYPE, StageTimer, registry as metrics
+from ollama_client import AsyncOllamaClient
+from response_cache import get_cache, get_transcript_cache
+import transcriber
+from transcription_pool import TRANSCRIBE_WORKERS, TranscriptionPool
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+ASK_HOST = os.environ.get('ASK_HOST', '0.0.0.0')
+ASK_PORT = int(os.environ.get('ASK_PORT', '5000'))
+# Threads for decode + transcription; beyond this, requests queue in the executor
+TRANSCRIBE_THREADS = int(os.environ.get('TRANSCRIBE_THREADS', str(max(1, TRANSCRIBE_WORKERS))))
+WHISPER_WARM_UP = os.environ.get('WHISPER_WARM_UP', '1') == '1'
+
+executor = ThreadPoolExecutor(TRANSCRIBE_THREADS, thread_name_prefix='transcribe')
+pool = None
+client = None
+
+
+def _content_type(upload):
+    """Split ``audio/l16; rate=16000`` into the mimetype and its parameters."""
+    mimetype, *params = (upload.content_type or '').split(';')
+    return mimetype.strip(), dict(p.strip().split('=', 1) for p in params if '=' in p)
+
+
+def _transcribe(data, mimetype, params, sample_rate, filename, lang, timer):
+    model = pool or transcriber.get_transcriber()
+    return transcribe_upload(model, data, mimetype, params, sample_rate, filename, lang, timer)
+
+
+class MetricsMiddleware:
+    """ask_api.py's request hooks for ASGI: request counts, in-flight gauge and the timing log line.
+
+    Each request gets a ``StageTimer`` as ``request.state.timer``. The
+    middleware wraps the whole response, so streamed answers stay in flight
+    until their last event is sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        timer = StageTimer(STAGE_SECONDS)
+        scope.setdefault('state', {})['timer'] = timer
+        status = {'code': 500}
+
+        async def send_with_status(message):
+            if message['type'] == 'http.response.start':
+                status['code'] = message['status']
+            await send(message)
+
+        IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            IN_FLIGHT.dec()
+            endpoint = getattr(scope.get('endpoint'), '__name__', 'unknown')
+            REQUESTS.inc(endpoint=endpoint, status=status['code'])
+            if ASK_LOG_TIMINGS and timer.stages:
+                print(json.dumps({'endpoint': endpoint, 'status': status['code'],
+                                  'timings_ms': timer.as_dict()}))
+
+
+async def transcribe_request(request):
+    """Validate the /ask form and return (question, language)."""
+    form = await request.form()
+    lang = form.get('language', 'en')
+    if lang not in ['en', 'hi']:
+        raise AskError('Invalid language')
+    upload = form.get('audio')
+    if upload is None or isinstance(upload, str):
+        raise AskError('No audio file uploaded')
+
+    timer = request.state.timer
+    with timer.stage('upload'):
+        data = await upload.read()
+    mimetype, params = _content_type(upload)
+    loop = asyncio.get_running_loop()
+    text = await loop.run_in_executor(executor, _transcribe, data, mimetype, params,
+                                      form.get('sample_rate'), upload.filename, lang, timer)
+
+    question = text.strip()
+    if len(question) < 3:
+        raise AskError('Transcription too short or unclear.')
+    return question, lang
+
+
+async def ask(request):
+    timer = request.state.timer
+    try:
+        question, _ = await transcribe_request(request)
+        key = cached_answer_key(question, client)
+        answer = get_cache().get(key)
+        if answer is not None:
+            return JSONResponse({'question': question, 'answer': answer, 'cached': True,
+                                 'timings_ms': timer.as_dict()})
+
+        with timer.stage('llm'):
+            result = await client.generate(build_prompt(question))
+        observe_ollama(result)
+        answer = result.get('response')
+        if answer:
+            get_cache().put(key, answer)
+        return JSONResponse({'question': question, 'answer': answer or 'No response received',
+                             'timings_ms': timer.as_dict()})
+    except AskError as e:
+        return JSONResponse({'error': str(e), 'timings_ms': timer.as_dict()}, status_code=e.status)
+    except Exception as e:
+        return JSONResponse({'error': str(e), 'timings_ms': timer.as_dict()}, status_code=500)
+
+
+async def ask_stream(request):
+    """Same events as ask_api.py's /ask/stream (NDJSON, or SSE on request)."""
+    timer = request.state.timer
+    try:
+        question, _ = await transcribe_request(request)
+        use_sse = ((await request.form()).get('format') == 'sse'
+                   or 'text/event-stream' in request.headers.get('accept', ''))
+    except AskError as e:
+        return JSONResponse({'error': str(e), 'timings_ms': timer.as_dict()}, status_code=e.status)
+    except Exception as e:
+        return JSONResponse({'error': str(e), 'timings_ms': timer.as_dict()}, status_code=500)
+
+    def encode(event):
+        if use_sse:
+            return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        return json.dumps(event) + '\n'
+
+    async def generate():
+        yield encode({'type': 'question', 'question': question})
+        key = cached_answer_key(question, client)
+        cached = get_cache().get(key)
+        if cached is not None:
+            yield encode({'type': 'token', 'token': cached})
+            yield encode({'type': 'done', 'question': question, 'answer': cached, 'cached': True,
+                          'timings_ms': timer.as_dict()})
+            return
+
+        answer = ''
+        start = time.perf_counter()
+        try:
+            async for data in client.stream_generate(build_prompt(question)):
+                piece = data.get('response', '')
+                if piece:
+                    if not answer:
+                        timer.add('llm_first_token', time.perf_counter() - start)
+                    answer += piece
+                    yield encode({'type': 'token', 'token': piece})
+                if data.get('done'):
+                    observe_ollama(data)
+            timer.add('llm', time.perf_counter() - start)
+            if answer:
+                get_cache().put(key, answer)
+            yield encode({'type': 'done', 'question': question, 'answer': answer,
+                          'timings_ms': timer.as_dict()})
+        except Exception as e:
+            yield encode({'type': 'error', 'error': str(e), 'timings_ms': timer.as_dict()})
+
+    mimetype = 'text/event-stream' if use_sse else 'application/x-ndjson'
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    return StreamingResponse(generate(), media_type=mimetype, headers=headers)
+
+
+async def cache_stats(request):
+    return JSONResponse({'answers': get_cache().stats(), 'transcripts': get_transcript_cache().stats()})
+
+
+async def prometheus_metrics(request):
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
+
+
+async def health(request):
+    workers = pool.stats() if pool else []
+    ok = all(w['alive'] for w in workers)
+    return JSONResponse({'ok': ok, 'workers': workers}, status_code=200 if ok else 503)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    global client, pool
+    client = AsyncOllamaClient()
+    if TRANSCRIBE_WORKERS > 0:
+        pool = TranscriptionPool(TRANSCRIBE_WORKERS)
+        print(f"🎙️ Started {TRANSCRIBE_WORKERS} Whisper worker processes")
+    elif WHISPER_WARM_UP:
+        transcriber.warm_up_async()
+    # The gauges ask_api.py registers read its own pool, which is never set here
+    QUEUE_DEPTH.set_function(lambda: pool.waiting if pool else 0)
+    BUSY_WORKERS.set_function(lambda: pool.busy if pool else 0)
+    try:
+        yield
+    finally:
+        await client.aclose()
+        if pool:
+            pool.close()
+        executor.shutdown(wait=False)
+
+
+app = Starlette(
+    routes=[
+        Route('/ask', ask, methods=['POST']),
+        Route('/ask/stream', ask_stream, methods=['POST']),
+        Route('/cache/stats', cache_stats, methods=['GET']),
+        Route('/metrics', prometheus_metrics, methods=['GET']),
+        Route('/health', health, methods=['GET']),
+    ],
+    middleware=[Middleware(MetricsMiddleware)],
+    lifespan=lifespan,
+)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    uvicorn.run(app, host=ASK_HOST, port=ASK_PORT)
@@ -0,0 +1,135 @@
+import io
+import subprocess
+import wave
+
+import numpy as np
+
+# Whisper works on 16 kHz mono float32 in [-1, 1]
+WHISPER_SAMPLE_RATE = 16000
+
+RAW_PCM_MIMETYPES = ('audio/l16', 'audio/pcm', 'audio/x-pcm')
+# audio/L16 is network byte order (RFC 2586); the others are little-endian like WAV
+BIG_ENDIAN_MIMETYPES = ('audio/l16',)
+
+# Windowed-sinc length used when decimating 32/48 kHz captures
+DECIMATION_TAPS = 63
+
+
+def pcm_to_float32(raw, sample_width, channels=1, byteorder='<'):
+    """Convert interleaved PCM bytes (little-endian unless ``byteorder='>'``) to mono float32."""
+    if sample_width == 1:
+        # 8-bit WAV is unsigned
+        audio = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        audio = np.frombuffer(raw, dtype=byteorder + 'i2').astype(np.float32) / 32768.0
+    elif sample_width == 4:
+        audio = np.frombuffer(raw, dtype=byteorder + 'i4').astype(np.float32) / 2147483648.0
+    else:
+        return None
+
+    if channels > 1:
+        audio = audio[:len(audio) - len(audio) % channels]
+        audio = audio.reshape(-1, channels).mean(axis=1)
+    return audio
+
+
+def resample_to_whisper(audio, rate):
+    """Bring mono float32 audio to 16 kHz, or return ``None`` if we can't do it cheaply.
+
+    Integer multiples (32 kHz, 48 kHz) are low-pass filtered and decimated,
+    lower rates are linearly interpolated up. Anything else goes to ffmpeg.
+    """
+    if rate == WHISPER_SAMPLE_RATE:
+        return audio
+    if rate > WHISPER_SAMPLE_RATE and rate % WHISPER_SAMPLE_RATE == 0:
+        factor = rate // WHISPER_SAMPLE_RATE
+        n = np.arange(DECIMATION_TAPS) - (DECIMATION_TAPS - 1) / 2
+        taps = np.sinc(n / factor) * np.hamming(DECIMATION_TAPS)
+        taps /= taps.sum()
+        filtered = np.convolve(audio, taps.astype(np.float32), mode='same')
+        return np.ascontiguousarray(filtered[::factor], dtype=np.float32)
+    if rate < WHISPER_SAMPLE_RATE:
+        n_out = int(round(len(audio) * WHISPER_SAMPLE_RATE / rate))
+        positions = np.arange(n_out, dtype=np.float64) * rate / WHISPER_SAMPLE_RATE
+        return np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+    return None
+
+
+def decode_wav_bytes(data):
+    """Decode a PCM WAV file held in memory.
+
+    Returns a float32 array ready for ``model.transcribe``, or ``None`` when the
+    data isn't integer PCM at a rate we can resample and has to go through
+    ffmpeg instead.
+    """
+    if len(data) < 12 or data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+        return None
+    try:
+        with wave.open(io.BytesIO(data), 'rb') as wav:
+            raw = wav.readframes(wav.getnframes())
+            audio = pcm_to_float32(raw, wav.getsampwidth(), wav.getnchannels())
+            if audio is None:
+                return None
+            return resample_to_whisper(audio, wav.getframerate())
+    except (wave.Error, EOFError):
+        # Float, A-law, extensible headers etc. are left to ffmpeg
+        return None
+
+
+def _positive_int(value, name):
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        number = 0
+    if number <= 0:
+        raise ValueError(f'Invalid {name}: {value!r}')
+    return number
+
+
+def decode_audio_bytes(data, mimetype='', params=None, sample_rate=None):
+    """Try to decode uploaded bytes without touching disk.
+
+    Handles WAV and raw 16-bit PCM (``audio/l16``, big-endian, or
+    ``audio/pcm``/``audio/x-pcm``, little-endian) whose rate comes from the
+    ``rate`` mimetype parameter or ``sample_rate``; ``params`` are the mimetype
+    parameters (``rate``, ``channels``). Returns the float32 audio, or ``None``
+    when the data needs the ffmpeg fallback. Raises ``ValueError`` for raw PCM
+    with a bad rate or channel count.
+    """
+    params = params or {}
+    mimetype = (mimetype or '').lower()
+    if mimetype in RAW_PCM_MIMETYPES:
+        if sample_rate in (None, ''):
+            sample_rate = params.get('rate', WHISPER_SAMPLE_RATE)
+        rate = _positive_int(sample_rate, 'sample rate')
+        channels = _positive_int(params.get('channels', 1), 'channel count')
+        byteorder = '>' if mimetype in BIG_ENDIAN_MIMETYPES else '<'
+        data = data[:len(data) - len(data) % 2]  # a stray trailing byte isn't a sample
+        audio = resample_to_whisper(pcm_to_float32(data, 2, channels, byteorder), rate)
+        if audio is None:
+            # ffmpeg can't sniff headerless PCM, so there is no fallback
+            raise ValueError(f'Unsupported raw PCM sample rate: {rate}')
+        return audio
+
+    return decode_wav_bytes(data)
+
+
+def decode_with_ffmpeg(data):
+    """Decode any container/codec ffmpeg understands to 16 kHz mono float32, via pipes."""
+    cmd = ['ffmpeg', '-nostdin', '-threads', '0', '-i', 'pipe:0',
+           '-f', 's16le', '-ac', '1', '-acodec', 'pcm_s16le', '-ar', str(WHISPER_SAMPLE_RATE), '-']
+    try:
+        out = subprocess.run(cmd, input=data, capture_output=True, check=True).stdout
+    except FileNotFoundError:
+        raise ValueError('ffmpeg is required to decode this audio format')
+    except subprocess.CalledProcessError as e:
+        raise ValueError(f'ffmpeg could not decode audio: {e.stderr.decode(errors="ignore").strip()[-200:]}')
+    return pcm_to_float32(out, 2)
+
+
+def load_audio_bytes(data):
+    """Decode a whole audio file held in memory, in-process for WAV, else with ffmpeg."""
+    audio = decode_wav_bytes(data)
+    if audio is None:
+        audio = decode_with_ffmpeg(data)
+    return audio
@@ -0,0 +1,159 @@
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+
+from audio_io import WHISPER_SAMPLE_RATE, load_audio_bytes
+import transcriber
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+WINDOW_SECONDS = 30  # Whisper's fixed input length
+BATCH_SIZE = int(os.environ.get("WHISPER_BATCH_SIZE", "8"))  # windows per encoder pass
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".m4a", ".flac", ".ogg", ".opus", ".webm", ".mp4")
+
+
+def split_windows(audio, seconds=WINDOW_SECONDS):
+    """Cut audio into consecutive windows; the last one is padded by the model."""
+    size = int(seconds * WHISPER_SAMPLE_RATE)
+    return [audio[i:i + size] for i in range(0, len(audio), size)] or [audio]
+
+
+def _result(entry):
+    if "error" in entry:
+        return {"file": entry["file"], "error": entry["error"]}
+    return {
+        "file": entry["file"],
+        "text": " ".join(t.strip() for t in entry["texts"] if t and t.strip()),
+        "duration": entry["duration"],
+        "windows": len(entry["texts"]),
+    }
+
+
+def transcribe_files(sources, language=None, batch_size=BATCH_SIZE, model=None):
+    """Transcribe many audio files with batched Whisper passes.
+
+    ``sources`` yields ``(name, data)`` pairs of raw file bytes and is read
+    lazily, only as far as needed to fill the next batch. Every file is split
+    into 30 s windows and windows from consecutive files share encoder passes
+    of ``batch_size``. One result dict per file is yielded, in input order, as
+    soon as its last window is decoded.
+    """
+    model = model or transcriber.get_transcriber()
+    sources = iter(sources)
+    pending = deque()  # files in input order, waiting for their windows
+    queued = deque()  # (entry, index, window) not yet decoded
+    exhausted = False
+
+    while True:
+        while len(queued) < batch_size and not exhausted:
+            try:
+                name, data = next(sources)
+            except StopIteration:
+                exhausted = True
+                break
+            entry = {"file": name}
+            pending.append(entry)
+            try:
+                if not data:
+                    raise ValueError("empty or unreadable file")
+                audio = load_audio_bytes(data)
+            except ValueError as e:
+                entry["error"] = str(e)
+                entry["remaining"] = 0
+                continue
+            windows = split_windows(audio)
+            entry.update(duration=round(len(audio) / WHISPER_SAMPLE_RATE, 2),
+                         texts=[None] * len(windows), remaining=len(windows))
+            queued.extend((entry, i, w) for i, w in enumerate(windows))
+
+        batch = []
+        while queued and len(batch) < batch_size:
+            item = queued.popleft()
+            if "error" in item[0]:
+                item[0]["remaining"] -= 1  # the file already failed; skip its windows
+            else:
+                batch.append(item)
+        if batch:
+            try:
+                texts = model.transcribe_batch([w for _, _, w in batch], language=language)
+            except Exception as e:
+                texts = None
+                for entry, _, _ in batch:
+                    entry.setdefault("error", f"transcription failed: {e}")
+            for n, (entry, i, _) in enumerate(batch):
+                if texts is not None:
+                    entry["texts"][i] = texts[n]
+                entry["remaining"] -= 1
+
+        while pending and pending[0]["remaining"] <= 0:
+            yield _result(pending.popleft())
+
+        if exhausted and not queued and not pending:
+            return
+
+
+def iter_audio_files(paths):
+    """Expand files and directories (recursively) into audio file paths, sorted."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(AUDIO_EXTENSIONS):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def read_files(paths):
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError as e:
+            # Unreadable files become error results rather than ending the run
+            data = b""
+            print(f"❌ Could not read {path}: {e}", file=sys.stderr)
+        yield path, data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Batch-transcribe audio files with Whisper; writes one JSON line per file.")
+    parser.add_argument("paths", nargs="+", help="audio files and/or directories")
+    parser.add_argument("--language", default=None, help="e.g. en or hi (default: auto-detect)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="30 s windows per encoder pass")
+    parser.add_argument("--model", default=None, help="Whisper model size (default: WHISPER_MODEL_SIZE)")
+    parser.add_argument("--output", default=None, help="write JSON lines here instead of stdout")
+    args = parser.parse_args(argv)
+
+    files = list(iter_audio_files(args.paths))
+    if not files:
+        print("❌ No audio files found", file=sys.stderr)
+        return 1
+
+    model = transcriber.get_transcriber(args.model)
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    start = time.time()
+    errors = 0
+    try:
+        for n, result in enumerate(transcribe_files(read_files(files), args.language,
+                                                    args.batch_size, model), 1):
+            errors += "error" in result
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+            print(f"📝 [{n}/{len(files)}] {result['file']}", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"✅ {len(files)} files in {time.time() - start:.1f}s ({errors} failed)", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
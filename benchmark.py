@@ -0,0 +1,274 @@
+"""Latency benchmark for the voice -> answer pipeline.
+
+Replays WAV fixtures through the code ask_api.py runs (in-memory decode, the
+shared transcriber and /ask/stream itself, via Flask's test client) against a
+local stub Ollama server that streams tokens at a fixed rate, so the numbers
+don't depend on the GPU or on Gemma's mood. Results are p50/p95/p99 in
+milliseconds per stage, written as sorted JSON so runs can be diffed between
+commits; ``--compare`` fails when a stage got slower than ``--tolerance``.
+
+    python benchmark.py --iterations 20 --output bench.json
+    python benchmark.py --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+STAGES = ("model_load", "decode", "transcription", "first_token", "total")
+
+
+# -------------------------------
+# STUB OLLAMA
+# -------------------------------
+class StubOllama:
+    """Minimal stand-in for Ollama's /api/generate and /api/tags.
+
+    Waits ``prompt_ms`` (prompt evaluation) and then emits ``tokens`` tokens
+    at ``tokens_per_second``, streamed as NDJSON or as one JSON reply.
+    """
+
+    def __init__(self, tokens=40, tokens_per_second=50.0, prompt_ms=100, model="gemma:2b"):
+        self.tokens = tokens
+        self.tokens_per_second = tokens_per_second
+        self.prompt_ms = prompt_ms
+        self.model = model
+        self.requests = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _json(self, body):
+                data = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._json({"models": [{"name": stub.model}]})
+                else:
+                    self.send_error(404)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                if self.path != "/api/generate":
+                    self.send_error(404)
+                    return
+                stub.requests += 1
+                if not payload.get("prompt"):
+                    # Empty prompt = load the model only
+                    self._json({"model": stub.model, "response": "", "done": True})
+                    return
+                time.sleep(stub.prompt_ms / 1000)
+                pieces = [f" token{i}" for i in range(stub.tokens)]
+                final = {"model": stub.model, "response": "", "done": True,
+                         "context": list(range(stub.tokens)), "eval_count": stub.tokens}
+                if not payload.get("stream", True):
+                    time.sleep(stub.tokens / stub.tokens_per_second)
+                    self._json(dict(final, response="".join(pieces)))
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for piece in pieces:
+                    time.sleep(1 / stub.tokens_per_second)
+                    self._chunk(json.dumps({"model": stub.model, "response": piece, "done": False}) + "\n")
+                self._chunk(json.dumps(final) + "\n")
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _chunk(self, text):
+                data = text.encode()
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name="stub-ollama", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# -------------------------------
+# MEASUREMENT
+# -------------------------------
+def summarize(samples):
+    """Percentiles in milliseconds for a list of durations in seconds."""
+    ms = np.asarray(samples, dtype=np.float64) * 1000
+    return {
+        "n": int(len(ms)),
+        "mean_ms": round(float(ms.mean()), 2),
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(ms, 95)), 2),
+        "p99_ms": round(float(np.percentile(ms, 99)), 2),
+    }
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def run_benchmark(fixtures, iterations, load_iterations, language, size):
+    # Imported here so OLLAMA_*/cache settings from main() are already in the environment
+    import ask_api
+    import transcriber
+    from audio_io import decode_audio_bytes
+    from whisper_models import registry
+
+    samples = {stage: [] for stage in STAGES}
+
+    for _ in range(load_iterations):
+        registry.clear()
+        model, seconds = timed(transcriber.get_transcriber, size)
+        samples["model_load"].append(seconds)
+    model = transcriber.get_transcriber(size)
+    model.warm_up()
+
+    data = {path: open(path, "rb").read() for path in fixtures}
+    client = ask_api.app.test_client()
+    for i in range(iterations):
+        for path, blob in data.items():
+            audio, seconds = timed(decode_audio_bytes, blob)
+            samples["decode"].append(seconds)
+            if audio is None:
+                audio = path  # compressed fixture: Whisper decodes it through ffmpeg
+            _, seconds = timed(model.transcribe, audio, language=language)
+            samples["transcription"].append(seconds)
+
+            # The whole /ask/stream request, as a client sees it
+            start = time.perf_counter()
+            response = client.post('/ask/stream', data={
+                'language': language,
+                'audio': (open(path, 'rb'), os.path.basename(path)),
+            }, buffered=False)
+            if response.status_code != 200:
+                raise RuntimeError(f"/ask/stream returned {response.status_code}: {response.get_data(True)}")
+            first_token = None
+            for chunk in response.response:
+                for raw in chunk.splitlines():
+                    event = json.loads(raw)
+                    if event['type'] == 'token' and first_token is None:
+                        first_token = time.perf_counter() - start
+                    elif event['type'] == 'error':
+                        raise RuntimeError(event['error'])
+            samples["total"].append(time.perf_counter() - start)
+            response.close()
+            if first_token is not None:
+                samples["first_token"].append(first_token)
+        print(f"⏱️ iteration {i + 1}/{iterations}", file=sys.stderr)
+
+    return {stage: summarize(values) for stage, values in samples.items() if values}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(old, new, tolerance):
+    """Print per-stage p50/p95 changes; returns the stages that regressed."""
+    regressions = []
+    for stage in STAGES:
+        if stage not in old.get("results", {}) or stage not in new["results"]:
+            continue
+        for metric in ("p50_ms", "p95_ms"):
+            before = old["results"][stage][metric]
+            after = new["results"][stage][metric]
+            change = (after - before) / before * 100 if before else 0.0
+            flag = ""
+            if change > tolerance:
+                flag = "  ❌ regression"
+                regressions.append(f"{stage}.{metric}")
+            print(f"{stage:>14} {metric}: {before:10.2f} -> {after:10.2f} ms ({change:+.1f}%){flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the voice -> answer pipeline.")
+    parser.add_argument("--fixtures", nargs="+", default=["record_out.wav"], help="WAV files to replay")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--load-iterations", type=int, default=1, help="cold model loads to time")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--model", default=None, help="Whisper size (default: WHISPER_MODEL_SIZE)")
+    parser.add_argument("--tokens", type=int, default=40, help="tokens per stub answer")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--prompt-ms", type=float, default=100, help="stub prompt-evaluation delay")
+    parser.add_argument("--output", default=None, help="write results here (default: stdout)")
+    parser.add_argument("--compare", default=None, help="earlier results to diff against")
+    parser.add_argument("--tolerance", type=float, default=10.0, help="allowed slowdown in percent")
+    args = parser.parse_args(argv)
+
+    stub = StubOllama(args.tokens, args.tokens_per_second, args.prompt_ms).start()
+    os.environ["OLLAMA_HOST"] = stub.url
+    os.environ["OLLAMA_MODEL"] = stub.model
+    # Caches would turn every iteration after the first into a lookup
+    os.environ["RESPONSE_CACHE_SIZE"] = "0"
+    os.environ["TRANSCRIPT_CACHE_SIZE"] = "0"
+    if args.model:
+        # /ask/stream transcribes with the default size; make every stage use the same model
+        os.environ["WHISPER_MODEL_SIZE"] = args.model
+    try:
+        results = run_benchmark(args.fixtures, args.iterations, args.load_iterations,
+                                args.language, args.model)
+    finally:
+        stub.stop()
+
+    import transcriber
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(terse=True),
+            "whisper": transcriber.model_id(args.model),
+            "fixtures": args.fixtures,
+            "iterations": args.iterations,
+            "stub": {"tokens": args.tokens, "tokens_per_second": args.tokens_per_second,
+                     "prompt_ms": args.prompt_ms},
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, sort_keys=True) + "\n"
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(json.load(f), report, args.tolerance)
+        if regressions:
+            print(f"❌ Slower than {args.compare}: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
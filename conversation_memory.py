@@ -0,0 +1,142 @@
+import os
+import threading
+from collections import deque, namedtuple
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("CONTEXT_TOKEN_BUDGET", "1024"))  # verbatim turns in a prompt
+SUMMARY_TOKEN_BUDGET = int(os.environ.get("SUMMARY_TOKEN_BUDGET", "200"))  # running summary length
+CHARS_PER_TOKEN = 4  # rough estimate for English; close enough for budgeting
+
+SUMMARY_PROMPT = """Update the running summary of a conversation with the new lines below.
+Keep names, decisions, open questions and numbers. Use at most {words} words.
+
+Current summary:
+{summary}
+
+New lines:
+{lines}
+
+Updated summary:"""
+
+Turn = namedtuple("Turn", "role content line tokens")
+
+
+def estimate_tokens(text):
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+class ConversationMemory:
+    """Recent turns kept verbatim within a token budget, older ones folded into a summary.
+
+    Each turn is formatted once when it is added, so building a prompt is a
+    single join over at most ``budget`` tokens no matter how long the session
+    runs. When the budget is exceeded the oldest turns are evicted and handed
+    to ``summarize_fn(summary, turns)`` on a background thread; until that
+    summary lands they stay in the prompt, so nothing is lost in between.
+    Without a ``summarize_fn`` evicted turns are simply dropped.
+    """
+
+    def __init__(self, budget=CONTEXT_TOKEN_BUDGET, summarize_fn=None, line_format="{role}: {content}"):
+        self.budget = budget
+        self.summarize_fn = summarize_fn
+        self.line_format = line_format
+        self.summary = ""
+        self._turns = deque()
+        self._evicted = []  # out of the budget, waiting to be summarized
+        self._tokens = 0
+        self._generation = 0  # bumped by clear() so a stale summary is discarded
+        self._lock = threading.Lock()
+        self._summarizer = None
+
+    def add(self, role, content):
+        line = self.line_format.format(role=role, content=content)
+        turn = Turn(role, content, line, estimate_tokens(line))
+        with self._lock:
+            self._turns.append(turn)
+            self._tokens += turn.tokens
+            # Always keep the newest turn, even if it alone is over budget
+            while self._tokens > self.budget and len(self._turns) > 1:
+                old = self._turns.popleft()
+                self._tokens -= old.tokens
+                if self.summarize_fn:
+                    self._evicted.append(old)
+            if self._evicted and self._summarizer is None:
+                self._summarizer = threading.Thread(target=self._summarize_loop,
+                                                    name="conversation-summary", daemon=True)
+                self._summarizer.start()
+        return turn
+
+    def _summarize_loop(self):
+        while True:
+            with self._lock:
+                batch = list(self._evicted)
+                summary = self.summary
+                generation = self._generation
+                if not batch:
+                    self._summarizer = None
+                    return
+            try:
+                summary = self.summarize_fn(summary, batch).strip()
+            except Exception as e:
+                # Keep the old summary; these turns are dropped rather than retried forever
+                print(f"⚠️ Conversation summary failed: {e}")
+            with self._lock:
+                if generation == self._generation:
+                    self.summary = summary
+                    del self._evicted[:len(batch)]
+
+    def lines(self):
+        """Prompt lines for the turns not covered by the summary, oldest first."""
+        with self._lock:
+            return [t.line for t in self._evicted] + [t.line for t in self._turns]
+
+    def render(self, summary_label="Summary of earlier conversation:"):
+        """Summary (if any) followed by the verbatim turns, as one string."""
+        with self._lock:
+            parts = [f"{summary_label} {self.summary}"] if self.summary else []
+            parts.extend(t.line for t in self._evicted)
+            parts.extend(t.line for t in self._turns)
+        return "\n".join(parts)
+
+    def build_prompt(self, suffix=""):
+        text = self.render()
+        return f"{text}\n{suffix}" if suffix else text
+
+    @property
+    def tokens(self):
+        """Estimated tokens of the verbatim turns (the summary is bounded separately)."""
+        with self._lock:
+            return self._tokens
+
+    def __len__(self):
+        with self._lock:
+            return len(self._turns)
+
+    def __bool__(self):
+        with self._lock:
+            return bool(self._turns or self._evicted or self.summary)
+
+    def clear(self):
+        with self._lock:
+            self._turns.clear()
+            self._evicted.clear()
+            self._tokens = 0
+            self.summary = ""
+            self._generation += 1
+
+
+def ollama_summarizer(client=None, max_tokens=SUMMARY_TOKEN_BUDGET, options=None):
+    """``summarize_fn`` that asks the local Ollama model to fold turns into the summary."""
+    from ollama_client import get_client
+
+    def summarize(summary, turns):
+        prompt = SUMMARY_PROMPT.format(words=int(max_tokens * 0.75), summary=summary or "(none)",
+                                       lines="\n".join(t.line for t in turns))
+        opts = {"temperature": 0.2, "num_predict": max_tokens}
+        opts.update(options or {})
+        result = (client or get_client()).generate(prompt, options=opts, timeout=60)
+        return result.get("response", "") or summary
+
+    return summarize
@@ -0,0 +1,140 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+LIVE_METRICS_FILE = os.environ.get("LIVE_METRICS_FILE", "")  # append one JSON line per interval; empty = off
+LIVE_METRICS_INTERVAL = float(os.environ.get("LIVE_METRICS_INTERVAL", "2"))  # seconds between status updates
+RTF_WINDOW = 10  # recent transcriptions averaged into the real-time factor
+REALTIME_RTF = 1.0  # above this Whisper is slower than the audio arrives
+
+
+class LiveMonitor:
+    """Real-time health of the live transcription loop.
+
+    The pipeline reports each transcription (``record_transcription``), LLM
+    call (``record_llm``) and lost chunk of audio (``record_dropped``);
+    ``queue_seconds_fn`` returns how much audio is waiting for Whisper. Every
+    ``interval`` seconds a snapshot goes to ``on_update`` and, when ``path``
+    is set, is appended to that file as a JSON line.
+
+    The real-time factor is processing time over audio time for the last
+    ``RTF_WINDOW`` transcriptions; ``model_size`` is only reported (set it
+    when the model changes).
+    """
+
+    def __init__(self, model_size, queue_seconds_fn=None, on_update=None,
+                 path=LIVE_METRICS_FILE, interval=LIVE_METRICS_INTERVAL):
+        self.model_size = model_size
+        self.queue_seconds_fn = queue_seconds_fn
+        self.on_update = on_update
+        self.path = path
+        self.interval = interval
+        self.transcriptions = 0
+        self.audio_seconds = 0.0
+        self.dropped_seconds = 0.0
+        self.dropped_chunks = 0
+        self.llm_calls = 0
+        self.llm_seconds = 0.0
+        self.last_llm_seconds = None
+        self._recent = deque(maxlen=RTF_WINDOW)  # (audio seconds, processing seconds)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # Reporting, called from the pipeline threads
+    def record_transcription(self, audio_seconds, seconds):
+        if audio_seconds <= 0:
+            return
+        with self._lock:
+            self.transcriptions += 1
+            self.audio_seconds += audio_seconds
+            self._recent.append((audio_seconds, seconds))
+
+    def record_dropped(self, audio_seconds):
+        with self._lock:
+            self.dropped_chunks += 1
+            self.dropped_seconds += audio_seconds
+
+    def record_llm(self, seconds):
+        with self._lock:
+            self.llm_calls += 1
+            self.llm_seconds += seconds
+            self.last_llm_seconds = seconds
+
+    def _rtf(self):
+        # Needs a few samples so one slow first call (model warm-up) doesn't count
+        if len(self._recent) < min(3, RTF_WINDOW):
+            return None
+        audio = sum(a for a, _ in self._recent)
+        return sum(s for _, s in self._recent) / audio if audio else None
+
+    def snapshot(self):
+        queue_seconds = 0.0
+        if self.queue_seconds_fn:
+            try:
+                queue_seconds = self.queue_seconds_fn()
+            except Exception:
+                pass
+        with self._lock:
+            rtf = self._rtf()
+            return {
+                "time": round(time.time(), 3),
+                "model": self.model_size,
+                "rtf": round(rtf, 3) if rtf is not None else None,
+                "queue_seconds": round(queue_seconds, 2),
+                "dropped_seconds": round(self.dropped_seconds, 2),
+                "dropped_chunks": self.dropped_chunks,
+                "transcriptions": self.transcriptions,
+                "audio_seconds": round(self.audio_seconds, 2),
+                "llm_last_seconds": round(self.last_llm_seconds, 3) if self.last_llm_seconds is not None else None,
+                "llm_avg_seconds": round(self.llm_seconds / self.llm_calls, 3) if self.llm_calls else None,
+            }
+
+    # Periodic reporting
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            snapshot = self.snapshot()
+            if self.on_update:
+                try:
+                    self.on_update(snapshot)
+                except Exception as e:
+                    print(f"⚠️ Live metrics update failed: {e}")
+            if self.path:
+                try:
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(snapshot) + "\n")
+                except OSError as e:
+                    print(f"⚠️ Could not write {self.path}: {e}")
+                    self.path = ""
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="live-monitor", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+def format_status(snapshot):
+    """One-line summary for a status bar, plus a color for it."""
+    rtf = snapshot["rtf"]
+    parts = [f"Whisper {snapshot['model'] or 'loading'}",
+             f"RTF {rtf:.2f}" if rtf is not None else "RTF -",
+             f"queue {snapshot['queue_seconds']:.1f}s"]
+    if snapshot["dropped_chunks"]:
+        parts.append(f"dropped {snapshot['dropped_seconds']:.1f}s")
+    if snapshot["llm_last_seconds"] is not None:
+        parts.append(f"LLM {snapshot['llm_last_seconds']:.1f}s")
+    color = 'gray'
+    if rtf is not None and rtf > REALTIME_RTF:
+        color = 'red'
+    elif rtf is not None and rtf > 0.75 * REALTIME_RTF:
+        color = 'orange'
+    return "📊 " + " · ".join(parts), color
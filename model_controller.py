@@ -0,0 +1,159 @@
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from transcriber import get_transcriber
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+# Sizes the controller may use, smallest first; each stays in the shared model registry once loaded
+WHISPER_SIZES = [s.strip() for s in os.environ.get("WHISPER_SIZES", "tiny,base,small").split(",") if s.strip()]
+WHISPER_LATENCY_TARGET = float(os.environ.get("WHISPER_LATENCY_TARGET", "1.5"))  # seconds per transcription
+WHISPER_SWITCH_COOLDOWN = float(os.environ.get("WHISPER_SWITCH_COOLDOWN", "30"))  # seconds before moving up again
+UPGRADE_MARGIN = 0.7  # move up only when the bigger size is predicted within 70% of the target
+CONTROLLER_WINDOW = 10  # recent transcriptions per size used for its speed
+MIN_SAMPLES = 3  # transcriptions on the current size before deciding anything
+
+# Decode cost relative to tiny (39M, 74M, 244M, 769M, 1550M parameters);
+# used for a size until it has been measured on this machine
+RELATIVE_COST = {"tiny": 1.0, "base": 1.9, "small": 6.3, "medium": 20.0, "large": 40.0}
+
+
+def _family(size):
+    """'medium.en' -> 'medium', 'large-v3' -> 'large'."""
+    name = size.partition(".")[0]
+    return "large" if name.startswith("large") else name
+
+
+class AdaptiveTranscriber:
+    """Transcriber that picks the largest Whisper size meeting a latency target.
+
+    Every ``transcribe`` call is timed against the length of its audio, giving
+    a seconds-per-audio-second speed for the size that ran it. The predicted
+    latency of a size is that speed times a typical call (the 90th percentile
+    of recent audio lengths); sizes not measured yet are extrapolated from the
+    current one with ``RELATIVE_COST``.
+
+    The controller steps down one size as soon as the current one is predicted
+    over ``target``, and steps up one size only when the next is predicted
+    under ``UPGRADE_MARGIN * target`` and ``cooldown`` seconds have passed
+    since the last switch - the gap between the two thresholds keeps it from
+    flapping. The new size is loaded through ``get_transcriber`` on a
+    background thread and swapped in once ready; ``on_switch(size)`` is then
+    called.
+    """
+
+    def __init__(self, sizes=None, target=WHISPER_LATENCY_TARGET, initial=None,
+                 cooldown=WHISPER_SWITCH_COOLDOWN, on_switch=None, **config):
+        self.sizes = list(sizes or WHISPER_SIZES)
+        initial = initial or self.sizes[0]
+        if initial not in self.sizes:
+            raise ValueError(f"initial size {initial!r} is not one of {self.sizes}")
+        self.target = target
+        self.cooldown = cooldown
+        self.on_switch = on_switch
+        self.config = config  # backend/device/... passed through to get_transcriber
+        self.size = initial
+        self.model = get_transcriber(initial, **config)
+        self.switches = 0
+        self._speed = {size: deque(maxlen=CONTROLLER_WINDOW) for size in self.sizes}
+        self._lengths = deque(maxlen=2 * CONTROLLER_WINDOW)
+        self._since_switch = 0
+        self._last_switch = time.monotonic()
+        self._switching = False
+        self._lock = threading.Lock()
+
+    # Transcriber interface
+    def transcribe(self, audio, language=None, **options):
+        model, size = self.model, self.size
+        start = time.perf_counter()
+        result = model.transcribe(audio, language=language, **options)
+        if isinstance(audio, np.ndarray):
+            self.record(size, len(audio) / 16000, time.perf_counter() - start)
+        return result
+
+    def warm_up(self):
+        self.model.warm_up()
+
+    def __repr__(self):
+        return f"<adaptive whisper {self.size} of {self.sizes}, target {self.target}s>"
+
+    # Control loop
+    def speed(self, size):
+        """Processing seconds per second of audio for ``size`` (measured or extrapolated)."""
+        samples = self._speed[size]
+        if samples:
+            return sum(s for _, s in samples) / sum(a for a, _ in samples)
+        measured = [s for s in self.sizes if self._speed[s]]
+        if not measured:
+            return None
+        # Extrapolate from the current size, or the nearest one measured so far
+        ref = self.size if self._speed[self.size] else min(
+            measured, key=lambda s: abs(self.sizes.index(s) - self.sizes.index(size)))
+        cost = RELATIVE_COST.get(_family(size), 1.0) / RELATIVE_COST.get(_family(ref), 1.0)
+        return self.speed(ref) * cost
+
+    def predicted_latency(self, size):
+        speed = self.speed(size)
+        if speed is None or not self._lengths:
+            return None
+        return speed * float(np.percentile(self._lengths, 90))
+
+    def record(self, size, audio_seconds, seconds):
+        """Feed one measured transcription; may start a switch to a neighbouring size."""
+        if audio_seconds <= 0 or size not in self._speed:
+            return
+        with self._lock:
+            self._speed[size].append((audio_seconds, seconds))
+            self._lengths.append(audio_seconds)
+            if size != self.size or self._switching:
+                return
+            self._since_switch += 1
+            if self._since_switch < MIN_SAMPLES:
+                return
+            index = self.sizes.index(self.size)
+            current = self.predicted_latency(self.size)
+            choice = None
+            if current > self.target and index > 0:
+                choice = self.sizes[index - 1]
+            elif index + 1 < len(self.sizes) and time.monotonic() - self._last_switch >= self.cooldown:
+                bigger = self.predicted_latency(self.sizes[index + 1])
+                if bigger < UPGRADE_MARGIN * self.target:
+                    choice = self.sizes[index + 1]
+            if choice is None:
+                return
+            self._switching = True
+            predicted = self.predicted_latency(choice)
+        print(f"🔁 Whisper {size} -> {choice}: predicted {predicted:.2f}s per transcription "
+              f"(now {current:.2f}s, target {self.target:.2f}s)")
+        threading.Thread(target=self._switch, args=(choice,), name="whisper-switch", daemon=True).start()
+
+    def _switch(self, size):
+        try:
+            model = get_transcriber(size, **self.config)
+        except Exception as e:
+            print(f"⚠️ Could not load Whisper {size}: {e}")
+            model = None
+        with self._lock:
+            if model is not None:
+                self.model, self.size = model, size
+                self.switches += 1
+            self._since_switch = 0
+            self._last_switch = time.monotonic()
+            self._switching = False
+        if model is not None and self.on_switch:
+            self.on_switch(size)
+
+    def stats(self):
+        with self._lock:
+            predicted = {}
+            for size in self.sizes:
+                latency = self.predicted_latency(size)
+                if latency is not None:
+                    predicted[size] = round(latency, 3)
+            return {"size": self.size, "switches": self.switches,
+                    "target_seconds": self.target, "predicted_seconds": predicted}
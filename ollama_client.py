@@ -0,0 +1,358 @@
+import asyncio
+import json
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+OLLAMA_HOST = os.environ.get("OLLAMA_HOST", "http://localhost:11434")
+OLLAMA_MODEL = os.environ.get("OLLAMA_MODEL", "gemma:2b")
+OLLAMA_CONNECT_TIMEOUT = float(os.environ.get("OLLAMA_CONNECT_TIMEOUT", "5"))
+OLLAMA_READ_TIMEOUT = float(os.environ.get("OLLAMA_READ_TIMEOUT", "120"))
+OLLAMA_RETRIES = int(os.environ.get("OLLAMA_RETRIES", "3"))
+OLLAMA_BACKOFF = float(os.environ.get("OLLAMA_BACKOFF", "0.5"))
+OLLAMA_POOL_SIZE = int(os.environ.get("OLLAMA_POOL_SIZE", "10"))
+# Async client only: requests in flight at once (the rest wait for a connection)
+OLLAMA_MAX_CONNECTIONS = int(os.environ.get("OLLAMA_MAX_CONNECTIONS", "100"))
+
+# How long Ollama keeps the model (and its KV cache) loaded after a request
+# (sent with every request; Ollama's own default is 5m)
+OLLAMA_KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+OLLAMA_LOAD_TIMEOUT = float(os.environ.get("OLLAMA_LOAD_TIMEOUT", "300"))  # first load from disk
+OLLAMA_REFRESH_INTERVAL = float(os.environ.get("OLLAMA_REFRESH_INTERVAL", "240"))  # keep-resident ping
+# Session context (tokens) carried between turns before falling back to a fresh prompt;
+# keep it below the model's num_ctx (2048 by default) so Ollama never silently truncates it
+OLLAMA_SESSION_MAX_CONTEXT = int(os.environ.get("OLLAMA_SESSION_MAX_CONTEXT", "1536"))
+
+RETRY_STATUSES = (502, 503, 504)
+
+
+class _OllamaBase:
+    """Host/model configuration and request building shared by both clients."""
+
+    def __init__(self, host=None, model=None, timeout=None):
+        self.host = (host or OLLAMA_HOST).rstrip("/")
+        if "://" not in self.host:
+            # OLLAMA_HOST is commonly set as "host:port" for the ollama CLI
+            self.host = "http://" + self.host
+        self.model = model or OLLAMA_MODEL
+        self.timeout = timeout or (OLLAMA_CONNECT_TIMEOUT, OLLAMA_READ_TIMEOUT)
+
+    def url(self, path):
+        return f"{self.host}{path}"
+
+    def _payload(self, prompt, model, stream, options, extra):
+        payload = {"model": model or self.model, "prompt": prompt, "stream": stream}
+        if options:
+            payload["options"] = options
+        if OLLAMA_KEEP_ALIVE:
+            payload["keep_alive"] = OLLAMA_KEEP_ALIVE
+        payload.update(extra)
+        return payload
+
+    @staticmethod
+    def _parse_line(line):
+        """Decode one NDJSON chunk; ``None`` for blank or garbled lines."""
+        if not line:
+            return None
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError:
+            return None
+        if "error" in data:
+            raise RuntimeError(data["error"])
+        return data
+
+    def has_model(self, models, model=None):
+        """Check a ``tags()`` listing for the model, treating a missing tag as ``:latest``."""
+        wanted = model or self.model
+        if ":" not in wanted:
+            wanted += ":latest"
+        return any(m.get("name", "") == wanted for m in models)
+
+
+class OllamaClient(_OllamaBase):
+    """Keep-alive client for the Ollama HTTP API.
+
+    A single pooled ``requests.Session`` is reused for every call, so repeated
+    questions don't pay a new TCP handshake. Connection failures and 502/503/504
+    responses are retried with exponential backoff.
+    """
+
+    def __init__(self, host=None, model=None, timeout=None, retries=OLLAMA_RETRIES,
+                 backoff=OLLAMA_BACKOFF, pool_size=OLLAMA_POOL_SIZE):
+        super().__init__(host, model, timeout)
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,  # never replay a generation the server may already be running
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(["GET", "POST"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def generate(self, prompt, model=None, options=None, timeout=None, **extra):
+        """Non-streaming /api/generate; returns Ollama's JSON response."""
+        payload = self._payload(prompt, model, False, options, extra)
+        response = self.session.post(self.url("/api/generate"), json=payload,
+                                     timeout=timeout or self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def stream_generate(self, prompt, model=None, options=None, timeout=None, **extra):
+        """Streaming /api/generate; yields each decoded chunk as it arrives."""
+        payload = self._payload(prompt, model, True, options, extra)
+        with self.session.post(self.url("/api/generate"), json=payload, stream=True,
+                               timeout=timeout or self.timeout) as r:
+            r.raise_for_status()
+            for line in r.iter_lines():
+                data = self._parse_line(line)
+                if data is None:
+                    continue
+                yield data
+                if data.get("done", False):
+                    break
+
+    def stream_text(self, prompt, model=None, options=None, timeout=None, **extra):
+        """Like ``stream_generate`` but yields only the text pieces."""
+        for data in self.stream_generate(prompt, model, options, timeout, **extra):
+            piece = data.get("response", "")
+            if piece:
+                yield piece
+
+    def tags(self, timeout=None):
+        response = self.session.get(self.url("/api/tags"), timeout=timeout or self.timeout)
+        response.raise_for_status()
+        return response.json().get("models", [])
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncOllamaClient(_OllamaBase):
+    """asyncio counterpart of ``OllamaClient`` built on ``httpx.AsyncClient``.
+
+    Waiting on Gemma costs an idle coroutine instead of a thread. Connection
+    errors are retried by the transport; 502/503/504 are retried here with the
+    same exponential backoff. Needs ``pip install httpx``.
+    """
+
+    def __init__(self, host=None, model=None, timeout=None, retries=OLLAMA_RETRIES,
+                 backoff=OLLAMA_BACKOFF, pool_size=OLLAMA_POOL_SIZE,
+                 max_connections=OLLAMA_MAX_CONNECTIONS):
+        import httpx
+
+        super().__init__(host, model, timeout)
+        self.retries = retries
+        self.backoff = backoff
+        connect, read = self.timeout if isinstance(self.timeout, tuple) else (self.timeout, self.timeout)
+        self.client = httpx.AsyncClient(
+            base_url=self.host,
+            timeout=httpx.Timeout(read, connect=connect, pool=None),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=pool_size),
+            transport=httpx.AsyncHTTPTransport(retries=retries),
+        )
+
+    async def _send(self, method, path, stream=False, **kwargs):
+        attempt = 0
+        while True:
+            request = self.client.build_request(method, path, **kwargs)
+            response = await self.client.send(request, stream=stream)
+            if response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                response.raise_for_status()
+                return response
+            await response.aclose()
+            await asyncio.sleep(self.backoff * 2 ** attempt)
+            attempt += 1
+
+    async def generate(self, prompt, model=None, options=None, timeout=None, **extra):
+        payload = self._payload(prompt, model, False, options, extra)
+        kwargs = {"timeout": timeout} if timeout else {}
+        response = await self._send("POST", "/api/generate", json=payload, **kwargs)
+        return response.json()
+
+    async def stream_generate(self, prompt, model=None, options=None, timeout=None, **extra):
+        payload = self._payload(prompt, model, True, options, extra)
+        kwargs = {"timeout": timeout} if timeout else {}
+        response = await self._send("POST", "/api/generate", stream=True, json=payload, **kwargs)
+        try:
+            async for line in response.aiter_lines():
+                data = self._parse_line(line)
+                if data is None:
+                    continue
+                yield data
+                if data.get("done", False):
+                    break
+        finally:
+            await response.aclose()
+
+    async def stream_text(self, prompt, model=None, options=None, timeout=None, **extra):
+        async for data in self.stream_generate(prompt, model, options, timeout, **extra):
+            piece = data.get("response", "")
+            if piece:
+                yield piece
+
+    async def tags(self, timeout=None):
+        kwargs = {"timeout": timeout} if timeout else {}
+        response = await self._send("GET", "/api/tags", **kwargs)
+        return response.json().get("models", [])
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+class GenerateSession:
+    """Multi-turn ``/api/generate`` that hands Ollama's ``context`` back each turn.
+
+    Every reply ends with the token context of the exchange so far. Sending it
+    with the next turn lets Ollama reuse the KV cache it still holds, so only
+    the new turn is prompt-evaluated instead of the whole conversation. The
+    context is dropped, and the next turn sent as a full prompt rebuilt by the
+    caller, once it outgrows ``max_context`` or a request carrying it fails
+    (model unloaded, changed or restarted).
+    """
+
+    def __init__(self, client=None, max_context=OLLAMA_SESSION_MAX_CONTEXT,
+                 keep_alive=OLLAMA_KEEP_ALIVE, options=None):
+        self.client = client or get_client()
+        self.max_context = max_context
+        self.keep_alive = keep_alive
+        self.options = options
+        self.context = None
+        self.last_stats = {}
+
+    def reset(self):
+        self.context = None
+
+    def stream_text(self, turn, full_prompt):
+        """Yield the reply to ``turn`` (just the new text) piece by piece.
+
+        ``full_prompt`` - a string, or a callable so it is only built when
+        needed - is sent instead whenever there is no reusable context.
+        """
+        use_context = self.context is not None
+        if use_context:
+            prompt, extra = turn, {"context": self.context}
+        else:
+            prompt, extra = (full_prompt() if callable(full_prompt) else full_prompt), {}
+
+        produced = False
+        try:
+            for data in self.client.stream_generate(prompt, options=self.options,
+                                                    keep_alive=self.keep_alive, **extra):
+                piece = data.get("response", "")
+                if piece:
+                    produced = True
+                    yield piece
+                if data.get("done", False):
+                    context = data.get("context")
+                    self.context = context if context and len(context) <= self.max_context else None
+                    self.last_stats = {k: data.get(k) for k in ("prompt_eval_count", "prompt_eval_duration",
+                                                                 "eval_count", "eval_duration")}
+        except Exception:
+            self.context = None
+            if use_context and not produced:
+                # The context no longer matches what the server has; start over once
+                yield from self.stream_text(turn, full_prompt)
+                return
+            raise
+
+
+class ModelKeeper:
+    """Preload the Ollama model and keep it resident while the assistant runs.
+
+    ``start`` sends an empty generate request (which only loads the model) in
+    the background, then repeats it every ``interval`` seconds so the model is
+    never unloaded between questions. ``on_status(text, color)`` receives
+    progress for a status line; callers that must not pay the load time can
+    block in ``wait_ready``, which waits only while a load is in progress and
+    returns at once when the last attempt failed (``last_error``).
+    """
+
+    def __init__(self, client=None, keep_alive=OLLAMA_KEEP_ALIVE, interval=OLLAMA_REFRESH_INTERVAL,
+                 load_timeout=OLLAMA_LOAD_TIMEOUT, on_status=None):
+        self.client = client or get_client()
+        self.keep_alive = keep_alive or "5m"
+        self.interval = interval
+        self.load_timeout = load_timeout
+        self.on_status = on_status
+        self.ready = threading.Event()
+        self.load_seconds = None
+        self.last_error = None
+        self._changed = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _status(self, text, color):
+        print(text)
+        if self.on_status:
+            self.on_status(text, color)
+
+    def _load(self):
+        timeout = (OLLAMA_CONNECT_TIMEOUT, self.load_timeout)
+        self.client.generate("", keep_alive=self.keep_alive, timeout=timeout)
+
+    def _run(self):
+        self._status(f"⏳ Loading {self.client.model}...", 'orange')
+        while not self._stop.is_set():
+            start = time.time()
+            try:
+                self._load()
+            except Exception as e:
+                with self._changed:
+                    self.ready.clear()
+                    self.last_error = e
+                    self._changed.notify_all()
+                self._status(f"⚠️ {self.client.model} not loaded: {e}", 'red')
+                self._stop.wait(min(self.interval, 30))
+                continue
+            if not self.ready.is_set():
+                self.load_seconds = time.time() - start
+                with self._changed:
+                    self.ready.set()
+                    self.last_error = None
+                    self._changed.notify_all()
+                self._status(f"🧠 {self.client.model} ready ({self.load_seconds:.1f}s to load)", 'green')
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="ollama-keeper", daemon=True)
+            self._thread.start()
+        return self
+
+    def wait_ready(self, timeout=None):
+        """``True`` once the model is loaded; ``False`` on timeout or if the last load attempt failed."""
+        timeout = self.load_timeout if timeout is None else timeout
+        with self._changed:
+            self._changed.wait_for(lambda: self.ready.is_set() or self.last_error is not None, timeout)
+            return self.ready.is_set()
+
+    def stop(self):
+        """Stop refreshing; Ollama unloads the model once ``keep_alive`` runs out."""
+        self._stop.set()
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide client configured from the environment."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = OllamaClient()
+        return _default_client
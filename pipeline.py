@@ -0,0 +1,137 @@
+import threading
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+
+# Backpressure policies for BoundedQueue.put when the queue is full
+BLOCK = "block"              # wait for room (never loses items)
+DROP_OLDEST = "drop_oldest"  # evict the oldest queued item
+DROP_NEWEST = "drop_newest"  # refuse the new item
+COALESCE = "coalesce"        # merge into the newest queued item, else drop oldest
+
+
+class BoundedQueue:
+    """Thread-safe FIFO with a fixed size and an explicit policy for when it is full.
+
+    With ``COALESCE`` every put first tries ``coalesce(last, new)``; a non-None
+    result replaces the newest queued item instead of adding one, so bursts of
+    mergeable work collapse into a single item. ``on_drop(item)`` is called
+    for every item evicted or refused under load.
+    """
+
+    def __init__(self, maxsize, policy=BLOCK, coalesce=None, name="queue", on_drop=None):
+        self.maxsize = maxsize
+        self.policy = policy
+        self.coalesce = coalesce
+        self.name = name
+        self.on_drop = on_drop
+        self.dropped = 0
+        self.coalesced = 0
+        self._items = deque()
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def put(self, item, timeout=None):
+        """Queue ``item``; returns ``False`` if it was refused or the queue is closed."""
+        with self._cond:
+            if self._closed:
+                return False
+            if self.coalesce and self._items:
+                merged = self.coalesce(self._items[-1], item)
+                if merged is not None:
+                    self._items[-1] = merged
+                    self.coalesced += 1
+                    self._cond.notify()
+                    return True
+
+            if len(self._items) >= self.maxsize:
+                if self.policy == BLOCK:
+                    if not self._cond.wait_for(
+                            lambda: len(self._items) < self.maxsize or self._closed, timeout):
+                        return False
+                    if self._closed:
+                        return False
+                elif self.policy == DROP_NEWEST:
+                    self.dropped += 1
+                    if self.on_drop:
+                        self.on_drop(item)
+                    return False
+                else:
+                    evicted = self._items.popleft()
+                    self.dropped += 1
+                    if self.on_drop:
+                        self.on_drop(evicted)
+
+            self._items.append(item)
+            self._cond.notify_all()
+            return True
+
+    def get(self, timeout=None):
+        """Next item, or ``None`` once the queue is closed and drained (or on timeout)."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._items or self._closed, timeout)
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def items(self):
+        """Snapshot of the queued items, oldest first."""
+        with self._cond:
+            return list(self._items)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
+
+
+class Worker(threading.Thread):
+    """Daemon thread that feeds every item from ``queue`` to ``handler``.
+
+    A failing item is logged and skipped; the worker keeps running until the
+    queue is closed.
+    """
+
+    def __init__(self, name, queue, handler):
+        super().__init__(name=name, daemon=True)
+        self.queue = queue
+        self.handler = handler
+        self.processed = 0
+        self.busy_seconds = 0.0
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            start = time.perf_counter()
+            try:
+                self.handler(item)
+            except Exception as e:
+                print(f"{self.name} error: {e}")
+            self.busy_seconds += time.perf_counter() - start
+            self.processed += 1
+
+    def stop(self):
+        self.queue.close()
+
+
+# -------------------------------
+# AUDIO CHUNKS
+# -------------------------------
+# Captured int16 audio for one utterance; ``final`` marks its last chunk
+AudioChunk = namedtuple("AudioChunk", "utterance_id audio final")
+
+
+def merge_audio_chunks(last, new):
+    """Coalesce consecutive chunks of the same open utterance into one."""
+    if last.utterance_id != new.utterance_id or last.final:
+        return None
+    return AudioChunk(new.utterance_id, np.concatenate((last.audio, new.audio)), new.final)
@@ -0,0 +1,98 @@
+"""Import-time profile for the assistant scripts.
+
+Imports each tool in a fresh interpreter under ``python -X importtime`` and
+reports how long its module load takes and which of its imports cost the
+most. Whisper/torch, sounddevice and keyboard are loaded on demand, so the
+window comes up before them; the run fails when one of those is imported at
+module load again or a tool exceeds ``--budget-ms``.
+
+    python profile_imports.py                  # test3 and test4
+    python profile_imports.py test4 --top 15 --budget-ms 500
+    python profile_imports.py --output imports.json
+
+test2.py opens its window at import, so profiling it needs a display.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+DEFAULT_TOOLS = ("test3", "test4")
+# Must not be imported while a tool module loads
+DEFERRED_MODULES = ("whisper", "torch", "faster_whisper", "sounddevice", "keyboard")
+
+
+def parse_importtime(stderr):
+    """``(module, depth, self_us, cumulative_us)`` for every line ``-X importtime`` printed."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            entries.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+        except ValueError:
+            continue
+    return entries
+
+
+def profile(tool, top):
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {tool}"],
+                          capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    entries = parse_importtime(proc.stderr)
+    report = {"tool": tool, "ok": proc.returncode == 0, "wall_ms": round(wall * 1000, 1)}
+    if not report["ok"]:
+        errors = [l for l in proc.stderr.splitlines() if not l.startswith("import time:")]
+        report["error"] = errors[-1] if errors else f"exit code {proc.returncode}"
+        return report
+
+    own = [e for e in entries if e[0] == tool]
+    report["import_ms"] = round(own[-1][3] / 1000, 1) if own else None
+    # Direct imports of the tool are one level below it
+    direct = [e for e in entries if e[1] == (own[-1][1] + 1 if own else 1)]
+    direct.sort(key=lambda e: e[3], reverse=True)
+    report["slowest"] = [{"module": name, "cumulative_ms": round(cum / 1000, 1)}
+                         for name, _, _, cum in direct[:top]]
+    loaded = {name.split(".")[0] for name, _, _, _ in entries}
+    report["deferred_imported"] = [m for m in DEFERRED_MODULES if m in loaded]
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile module import time of the assistant scripts.")
+    parser.add_argument("tools", nargs="*", default=list(DEFAULT_TOOLS), help="modules to import")
+    parser.add_argument("--top", type=int, default=10, help="slowest direct imports to list")
+    parser.add_argument("--budget-ms", type=float, default=0, help="fail when an import takes longer, 0 = off")
+    parser.add_argument("--output", default=None, help="also write the reports as JSON")
+    args = parser.parse_args(argv)
+
+    reports = [profile(tool, args.top) for tool in args.tools]
+    failed = False
+    for report in reports:
+        if not report["ok"]:
+            print(f"❌ {report['tool']}: import failed ({report['error']})")
+            failed = True
+            continue
+        print(f"⏱️ {report['tool']}: {report['import_ms']} ms import, {report['wall_ms']} ms with interpreter start")
+        for item in report["slowest"]:
+            print(f"    {item['cumulative_ms']:9.1f} ms  {item['module']}")
+        if report["deferred_imported"]:
+            print(f"❌ {report['tool']} imports {', '.join(report['deferred_imported'])} at module load")
+            failed = True
+        if args.budget_ms and report["import_ms"] and report["import_ms"] > args.budget_ms:
+            print(f"❌ {report['tool']} is over the {args.budget_ms:.0f} ms budget")
+            failed = True
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+            f.write("\n")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", "512"))  # entries in memory, 0 = off
+RESPONSE_CACHE_TTL = float(os.environ.get("RESPONSE_CACHE_TTL", "86400"))  # seconds, 0 = never expire
+RESPONSE_CACHE_PATH = os.environ.get("RESPONSE_CACHE_PATH", "")  # SQLite file; empty = memory only
+RESPONSE_CACHE_DISK_SIZE = int(os.environ.get("RESPONSE_CACHE_DISK_SIZE", "10000"))  # rows kept in SQLite, 0 = no cap
+TRANSCRIPT_CACHE_SIZE = int(os.environ.get("TRANSCRIPT_CACHE_SIZE", "1024"))
+TRANSCRIPT_CACHE_TTL = float(os.environ.get("TRANSCRIPT_CACHE_TTL", "86400"))
+TRANSCRIPT_CACHE_PATH = os.environ.get("TRANSCRIPT_CACHE_PATH", "")
+TRANSCRIPT_CACHE_DISK_SIZE = int(os.environ.get("TRANSCRIPT_CACHE_DISK_SIZE", "10000"))
+
+
+def normalize_text(text):
+    """Fold case, punctuation and spacing so trivially different transcripts share a key."""
+    return " ".join(re.sub(r"[^\w\s']", " ", text.lower()).split())
+
+
+def cache_key(*parts):
+    """Stable hash of JSON-serializable key parts."""
+    blob = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def answer_key(text, template, model, options=None):
+    """Key for an LLM answer: normalized transcript, prompt template, model and options."""
+    return cache_key(normalize_text(text), template, model, options or {})
+
+
+def audio_key(kind, blob, language, model, layout=None):
+    """Key for a transcript: content hash of ``blob`` (raw upload or decoded PCM), language and model.
+
+    ``layout`` holds whatever else decides how the bytes decode (the mimetype
+    and rate of headerless PCM).
+    """
+    return cache_key(kind, hashlib.sha256(blob).hexdigest(), language, model, layout)
+
+
+class ResponseCache:
+    """Thread-safe LRU cache with a TTL and an optional SQLite tier.
+
+    Values must be JSON-serializable. The memory tier holds at most
+    ``max_entries`` items; when ``path`` is set every put is also written to
+    SQLite, so entries survive restarts and are promoted back into memory on
+    their first hit. The SQLite tier keeps the ``disk_entries`` most recently
+    written rows. Expired entries are dropped lazily on lookup, from both tiers.
+    """
+
+    def __init__(self, max_entries=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL,
+                 path=RESPONSE_CACHE_PATH, table="responses", disk_entries=RESPONSE_CACHE_DISK_SIZE):
+        self.max_entries = max_entries
+        self.disk_entries = disk_entries
+        self.ttl = ttl
+        self.table = table
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._items = OrderedDict()  # key -> (expires, value)
+        self._lock = threading.Lock()
+        self._db = None
+        if path and max_entries > 0:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(f"CREATE TABLE IF NOT EXISTS {table} "
+                             "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)")
+            self._db.execute(f"DELETE FROM {table} WHERE expires > 0 AND expires < ?", (time.time(),))
+            self._db.commit()
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def _expiry(self):
+        return time.time() + self.ttl if self.ttl > 0 else 0
+
+    def _remember(self, key, expires, value):
+        self._items[key] = (expires, value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+
+    def get(self, key, default=None):
+        if not self.enabled:
+            return default
+        now = time.time()
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None:
+                expires, value = entry
+                if not expires or expires > now:
+                    self._items.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._items[key]
+
+            if self._db is not None:
+                row = self._db.execute(f"SELECT value, expires FROM {self.table} WHERE key = ?",
+                                       (key,)).fetchone()
+                if row and (not row[1] or row[1] > now):
+                    value = json.loads(row[0])
+                    self._remember(key, row[1], value)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return value
+                if row:
+                    self._db.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        if not self.enabled:
+            return
+        expires = self._expiry()
+        with self._lock:
+            self._remember(key, expires, value)
+            if self._db is not None:
+                self._db.execute(f"INSERT OR REPLACE INTO {self.table} (key, value, expires) "
+                                 "VALUES (?, ?, ?)", (key, json.dumps(value), expires))
+                if self.disk_entries > 0:
+                    # REPLACE gives the row a new rowid, so rowid order is write order;
+                    # trimming by rowid stays an index range delete
+                    self._db.execute(f"DELETE FROM {self.table} WHERE rowid <= "
+                                     f"(SELECT MAX(rowid) FROM {self.table}) - ?", (self.disk_entries,))
+                self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            if self._db is not None:
+                self._db.execute(f"DELETE FROM {self.table}")
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._items),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "persistent": self._db is not None,
+            }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_cache():
+    """Return the process-wide answer cache configured from the environment."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
+
+
+_transcript_cache = None
+
+
+def get_transcript_cache():
+    """Return the process-wide transcript cache; entries are short strings, bounded by count."""
+    global _transcript_cache
+    with _default_lock:
+        if _transcript_cache is None:
+            _transcript_cache = ResponseCache(TRANSCRIPT_CACHE_SIZE, TRANSCRIPT_CACHE_TTL,
+                                              TRANSCRIPT_CACHE_PATH, table="transcripts",
+                                              disk_entries=TRANSCRIPT_CACHE_DISK_SIZE)
+        return _transcript_cache
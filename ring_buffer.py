@@ -0,0 +1,140 @@
+import threading
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """Fixed-capacity ring of mono samples for the live capture loops.
+
+    Storage is preallocated once and mirrored (every sample is written at ``i``
+    and ``i + capacity``), so the most recent ``n`` samples are always one
+    contiguous slice and can be handed out as a NumPy view without copying.
+    Once the ring is full the oldest audio is overwritten, which replaces the
+    old ``MAX_BUFFER_DURATION`` trimming.
+
+    Views stay valid until ``capacity - n`` further samples are written; copy
+    (or convert with ``astype``) before holding on to one for longer.
+
+    Consumers block in ``wait_for_data`` and are woken by the next ``write``
+    (or an explicit ``wake``), so nothing needs to sleep-poll the buffer.
+    """
+
+    def __init__(self, seconds, sample_rate, dtype=np.int16):
+        self.sample_rate = sample_rate
+        self.capacity = int(seconds * sample_rate)
+        self._data = np.zeros(2 * self.capacity, dtype=dtype)
+        self._write_pos = 0
+        self._count = 0
+        self.total_written = 0  # absolute sample clock since start
+        self.dropped = 0  # samples overwritten before anyone cleared them
+        self._lock = threading.Lock()
+        self._data_ready = threading.Condition(self._lock)
+        self._wake_pending = False
+
+    def write(self, block):
+        """Append a block of samples; safe to call from the sounddevice callback."""
+        block = np.asarray(block).reshape(-1)
+        n = len(block)
+        if n == 0:
+            return
+        cap = self.capacity
+        with self._lock:
+            if n > cap:
+                self.dropped += n - cap
+                self.total_written += n - cap
+                block = block[-cap:]
+                n = cap
+
+            pos = self._write_pos
+            first = min(n, cap - pos)
+            self._data[pos:pos + first] = block[:first]
+            self._data[pos + cap:pos + cap + first] = block[:first]
+            rest = n - first
+            if rest:
+                self._data[:rest] = block[first:]
+                self._data[cap:cap + rest] = block[first:]
+
+            self._write_pos = (pos + n) % cap
+            overflow = self._count + n - cap
+            if overflow > 0:
+                self.dropped += overflow
+            self._count = min(cap, self._count + n)
+            self.total_written += n
+            self._data_ready.notify_all()
+
+    def wait_for_data(self, position, timeout=None):
+        """Block until audio past absolute sample ``position`` arrives.
+
+        Also returns early when ``wake`` is called. Returns ``True`` if there is
+        new audio, ``False`` on a wake-up or timeout without any.
+        """
+        with self._data_ready:
+            self._data_ready.wait_for(
+                lambda: self.total_written > position or self._wake_pending, timeout)
+            self._wake_pending = False
+            return self.total_written > position
+
+    def wake(self):
+        """Wake a consumer blocked in ``wait_for_data`` (help requests, shutdown)."""
+        with self._data_ready:
+            self._wake_pending = True
+            self._data_ready.notify_all()
+
+    def latest(self, n=None):
+        """Contiguous view of the newest ``n`` samples (all buffered audio by default)."""
+        with self._lock:
+            n = self._count if n is None else max(0, min(int(n), self._count))
+            end = self._write_pos + self.capacity
+            return self._data[end - n:end]
+
+    def last_seconds(self, seconds):
+        return self.latest(int(seconds * self.sample_rate))
+
+    def since(self, position):
+        """View of everything written after absolute sample ``position``.
+
+        Returns ``(view, new_position)``; audio that has already been
+        overwritten or cleared is skipped.
+        """
+        with self._lock:
+            n = max(0, min(self.total_written - position, self._count))
+            end = self._write_pos + self.capacity
+            return self._data[end - n:end], self.total_written
+
+    def span(self, start, end):
+        """View of absolute samples ``[start, end)``, clipped to what is still buffered."""
+        with self._lock:
+            oldest = self.total_written - self._count
+            start = max(start, oldest)
+            end = min(end, self.total_written)
+            if end <= start:
+                return self._data[:0]
+            base = self._write_pos + self.capacity - self.total_written
+            return self._data[base + start:base + end]
+
+    def snapshot(self):
+        """Return ``(view, position)``: all buffered audio and the clock at its end."""
+        with self._lock:
+            end = self._write_pos + self.capacity
+            return self._data[end - self._count:end], self.total_written
+
+    def discard_until(self, position):
+        """Drop audio up to absolute sample ``position``, keeping anything newer."""
+        with self._lock:
+            self._count = min(self._count, max(0, self.total_written - position))
+
+    def keep_last(self, seconds):
+        """Forget everything except the newest ``seconds`` of audio."""
+        with self._lock:
+            self._count = min(self._count, int(seconds * self.sample_rate))
+
+    def clear(self):
+        with self._lock:
+            self._count = 0
+
+    @property
+    def duration(self):
+        return self._count / self.sample_rate
+
+    def __len__(self):
+        return self._count
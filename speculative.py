@@ -0,0 +1,107 @@
+import difflib
+import threading
+import time
+
+from response_cache import normalize_text
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+MATCH_RATIO = 0.85  # how close the final text must be to the speculated one to reuse it
+MIN_CHARS = 15  # don't speculate on fragments shorter than this
+
+
+def similarity(a, b):
+    return difflib.SequenceMatcher(None, normalize_text(a), normalize_text(b)).ratio()
+
+
+class SpeculativeJob(threading.Thread):
+    """One background generation for ``text``; ``generate_fn`` must poll ``cancelled``."""
+
+    def __init__(self, text, generate_fn):
+        super().__init__(name="speculative-llm", daemon=True)
+        self.text = text
+        self.generate_fn = generate_fn
+        self.cancelled = threading.Event()
+        self.result = None
+        self.error = None
+        self.started_at = time.time()
+        self._done_lock = threading.Lock()
+        self._on_done = None
+        self._finished = False
+
+    def run(self):
+        try:
+            self.result = self.generate_fn(self.text, self.cancelled)
+        except Exception as e:
+            self.error = e
+        with self._done_lock:
+            self._finished = True
+            callback = self._on_done
+        if callback and not self.cancelled.is_set():
+            callback(self)
+
+    def when_done(self, callback):
+        """Call ``callback(job)`` once finished (right away if it already is)."""
+        with self._done_lock:
+            self._on_done = callback
+            finished = self._finished
+        if finished:
+            callback(self)
+
+    def cancel(self):
+        self.cancelled.set()
+
+
+class Speculator:
+    """Start LLM work on a partial transcript before the speaker has finished.
+
+    ``speculate(text)`` is called with each stable partial transcript; it
+    starts a background ``generate_fn(text, cancelled)`` and keeps it running
+    while later partials stay within ``match_ratio`` of the text it started
+    on, otherwise it cancels and restarts. ``finalize(text, on_result)``
+    commits the in-flight job when the final transcript still matches it -
+    ``on_result(job)`` then fires as soon as the answer is ready - or cancels
+    it and returns ``False`` so the caller asks the normal way.
+    """
+
+    def __init__(self, generate_fn, match_ratio=MATCH_RATIO, min_chars=MIN_CHARS):
+        self.generate_fn = generate_fn
+        self.match_ratio = match_ratio
+        self.min_chars = min_chars
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+        self._job = None
+        self._lock = threading.Lock()
+
+    def speculate(self, text):
+        text = text.strip()
+        if len(text) < self.min_chars:
+            return
+        with self._lock:
+            if self._job and similarity(self._job.text, text) >= self.match_ratio:
+                return
+            if self._job:
+                self._job.cancel()
+            self._job = SpeculativeJob(text, self.generate_fn)
+            self.started += 1
+            self._job.start()
+
+    def finalize(self, text, on_result):
+        with self._lock:
+            job, self._job = self._job, None
+        if job and similarity(job.text, text) >= self.match_ratio:
+            self.hits += 1
+            job.when_done(on_result)
+            return True
+        if job:
+            job.cancel()
+        self.misses += 1
+        return False
+
+    def cancel(self):
+        with self._lock:
+            job, self._job = self._job, None
+        if job:
+            job.cancel()
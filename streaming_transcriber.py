@@ -0,0 +1,125 @@
+import re
+from collections import namedtuple
+
+import numpy as np
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+STEP_SECONDS = 1.0        # new audio needed before the next re-decode
+TRIM_SECONDS = 6.0        # trim committed audio once the window is this long
+MAX_WINDOW_SECONDS = 15.0  # force-commit if nothing agrees within this window
+
+Word = namedtuple("Word", "start end text")
+TranscriptEvent = namedtuple("TranscriptEvent", "kind text committed tentative")
+
+
+def _norm(word):
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def _join(words):
+    return "".join(w.text for w in words).strip()
+
+
+class StreamingTranscriber:
+    """Incremental transcription of one utterance with partial hypotheses.
+
+    Audio is decoded over a sliding window every ``step_s`` seconds. Words are
+    committed with a local-agreement policy: a word becomes stable once two
+    consecutive hypotheses agree on it (LocalAgreement-2). Committed audio is
+    trimmed from the window, and if nothing agrees for ``max_window_s`` the
+    current hypothesis is committed outright, so any sample is re-encoded at
+    most ``max_window_s / step_s`` times instead of once per re-transcription.
+
+    ``transcribe_fn(audio, prompt)`` must return a list of ``Word`` tuples with
+    times in seconds relative to the start of ``audio``. Events go to
+    ``on_event`` and are also returned from ``insert_audio``/``finish``.
+    """
+
+    def __init__(self, transcribe_fn, sample_rate=16000, step_s=STEP_SECONDS,
+                 trim_s=TRIM_SECONDS, max_window_s=MAX_WINDOW_SECONDS, on_event=None):
+        self.transcribe_fn = transcribe_fn
+        self.sample_rate = sample_rate
+        self.step_samples = int(step_s * sample_rate)
+        self.trim_samples = int(trim_s * sample_rate)
+        self.max_window_samples = int(max_window_s * sample_rate)
+        self.on_event = on_event
+        self.reset()
+
+    def reset(self):
+        self._audio = np.zeros(0, dtype=np.float32)
+        self._offset = 0.0  # seconds of utterance audio already trimmed away
+        self._undecoded = 0
+        self.committed = []
+        self._tail = []
+        self.decode_passes = 0
+
+    def _emit(self, kind):
+        event = TranscriptEvent(kind, _join(self.committed + self._tail),
+                                _join(self.committed), _join(self._tail))
+        if self.on_event:
+            self.on_event(event)
+        return event
+
+    def _decode(self):
+        prompt = _join(self.committed[-30:]) or None
+        words = self.transcribe_fn(self._audio, prompt)
+        self.decode_passes += 1
+        self._undecoded = 0
+        last_end = self.committed[-1].end if self.committed else 0.0
+        # Whisper can repeat words from before the window edge; ignore them
+        return [Word(w.start + self._offset, w.end + self._offset, w.text)
+                for w in words if w.end + self._offset > last_end + 0.05]
+
+    def _trim_to(self, seconds):
+        cut = int((seconds - self._offset) * self.sample_rate)
+        if cut > 0:
+            self._audio = self._audio[cut:]
+            self._offset += cut / self.sample_rate
+
+    def insert_audio(self, audio):
+        """Add float32 audio; returns a partial event when a re-decode ran, else ``None``."""
+        self._audio = np.concatenate((self._audio, np.asarray(audio, dtype=np.float32).reshape(-1)))
+        self._undecoded += len(audio)
+        if self._undecoded < self.step_samples:
+            return None
+
+        hypothesis = self._decode()
+        agreed = 0
+        for old, new in zip(self._tail, hypothesis):
+            if _norm(old.text) != _norm(new.text):
+                break
+            agreed += 1
+        self.committed.extend(hypothesis[:agreed])
+        self._tail = hypothesis[agreed:]
+
+        if len(self._audio) >= self.max_window_samples:
+            # Nothing is settling down; accept what we have to bound the work
+            self.committed.extend(self._tail)
+            self._tail = []
+            if self.committed:
+                self._trim_to(self.committed[-1].end)
+            else:
+                self._trim_to(self._offset + len(self._audio) / self.sample_rate)
+        elif len(self._audio) >= self.trim_samples and self.committed:
+            self._trim_to(self.committed[-1].end)
+
+        return self._emit("partial")
+
+    def finish(self):
+        """Decode whatever is left, commit everything and return the final event."""
+        if len(self._audio) and self._undecoded:
+            self._tail = self._decode()
+        self.committed.extend(self._tail)
+        self._tail = []
+        event = self._emit("final")
+        self.reset()
+        return event
+
+
+def words_from_result(result):
+    """Pull ``Word`` tuples out of a ``model.transcribe(..., word_timestamps=True)`` result."""
+    return [Word(w["start"], w["end"], w["word"])
+            for segment in result.get("segments", [])
+            for w in segment.get("words", [])]
@@ -1,19 +1,26 @@
-import whisper
-import requests
 import sounddevice as sd
 import numpy as np
-import queue
-import json
+from audio_io import resample_to_whisper
+from conversation_memory import ConversationMemory, ollama_summarizer
+from ollama_client import GenerateSession
+from ring_buffer import AudioRingBuffer
+from model_controller import AdaptiveTranscriber
+from vad import Endpointer, create_vad
 
 # -------------------------------
 # CONFIG
 # -------------------------------
 fs = 8000   # Sample rate (lowered for less CPU usage)
 blocksize = 2048  # Increase blocksize for better buffering
-model = whisper.load_model("tiny")  # use "tiny" or "base" for faster real-time
-q = queue.Queue()
+max_buffer_duration = 30  # seconds of audio the ring can hold
+hangover_ms = 600  # trailing silence that ends a question
+max_utterance_duration = 15  # seconds; longer speech is transcribed in pieces
+model = AdaptiveTranscriber()  # tiny first, bigger sizes while they stay within WHISPER_LATENCY_TARGET
+audio_ring = AudioRingBuffer(max_buffer_duration, fs)
 
-conversation_history = []  # keep track of Q/A
+context_tokens = 1024  # recent Q/A kept verbatim; older turns are summarized
+conversation_memory = ConversationMemory(context_tokens, ollama_summarizer())  # keep track of Q/A
+gemma_session = GenerateSession()  # reuses Ollama's KV context between turns
 
 # -------------------------------
 # AUDIO STREAM HANDLER
@@ -21,59 +28,49 @@ conversation_history = []  # keep track of Q/A
 def audio_callback(indata, frames, time, status):
     if status:
         print(status)
-    q.put(indata.copy())
+    audio_ring.write(indata[:, 0])
 
 # -------------------------------
 # STREAM RESPONSE FROM GEMMA
 # -------------------------------
 def stream_to_gemma(question):
-    global conversation_history
-    conversation_history.append({"role": "user", "content": question})
+    conversation_memory.add("User", question)
 
-    # Combine history into a prompt
-    prompt = ""
-    for turn in conversation_history:
-        role = turn["role"].capitalize()
-        prompt += f"{role}: {turn['content']}\n"
-
-    ollama_url = "http://localhost:11434/api/generate"
-    payload = {
-        "model": "gemma:2b",
-        "prompt": prompt + "Assistant:",
-        "stream": True
-    }
+    # While Ollama's context is reusable only the new turn is evaluated; otherwise
+    # send the summary of older turns + the recent ones, bounded by context_tokens
+    turn = f"User: {question}\nAssistant:"
+    full_prompt = lambda: conversation_memory.build_prompt("Assistant:")
 
     answer = ""
     print("🤖 A: ", end="", flush=True)
-    with requests.post(ollama_url, json=payload, stream=True) as r:
-        for line in r.iter_lines():
-            if line:
-                data = json.loads(line.decode("utf-8"))
-                piece = data.get("response", "")
-                answer += piece
-                print(piece, end="", flush=True)
-        print()
+    for piece in gemma_session.stream_text(turn, full_prompt):
+        answer += piece
+        print(piece, end="", flush=True)
+    print()
 
-    conversation_history.append({"role": "assistant", "content": answer})
+    conversation_memory.add("Assistant", answer)
 
 # -------------------------------
 # REALTIME LOOP
 # -------------------------------
 def realtime_chat():
     print("🎤 Speak naturally... (Ctrl+C to stop)")
-    buffer = np.zeros((0, 1), dtype=np.int16)
-    chunk_duration = 2  # seconds, process every 2 seconds for lower latency
+    endpointer = Endpointer(create_vad("energy", fs), hangover_ms=hangover_ms,
+                            max_utterance_s=max_utterance_duration)
+    last_position = 0
 
-    with sd.InputStream(samplerate=fs, channels=1, callback=audio_callback, blocksize=blocksize):
+    with sd.InputStream(samplerate=fs, channels=1, callback=audio_callback, blocksize=blocksize, dtype='int16'):
         try:
             while True:
-                while not q.empty():
-                    data = q.get()
-                    buffer = np.concatenate((buffer, data))
+                # Sleep until the callback delivers the next block
+                audio_ring.wait_for_data(last_position, timeout=1.0)
+                new_audio, last_position = audio_ring.since(last_position)
 
-                # Process every chunk_duration seconds of speech
-                if buffer.shape[0] >= chunk_duration * fs:
-                    audio = buffer.flatten().astype(np.float32) / 32768.0
+                # Transcribe as soon as the speaker pauses
+                for utterance in endpointer.update(new_audio, last_position):
+                    audio = audio_ring.span(utterance.start_sample, utterance.end_sample)
+                    # Whisper expects 16 kHz; the capture runs at fs
+                    audio = resample_to_whisper(audio.astype(np.float32) / 32768.0, fs)
                     result = model.transcribe(audio, language="en")
                     question = result["text"].strip()
 
@@ -81,9 +78,6 @@ def realtime_chat():
                         print(f"\n📝 Q: {question}")
                         stream_to_gemma(question)
 
-                    # reset buffer
-                    buffer = np.zeros((0, 1), dtype=np.int16)
-
         except KeyboardInterrupt:
             print("\n🛑 Conversation stopped.")
 
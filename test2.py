@@ -1,15 +1,14 @@
-import whisper
 import requests
-import sounddevice as sd
 import numpy as np
-import queue
-import json
 import time
 import threading
 from collections import deque
 import tkinter as tk
 from tkinter import scrolledtext, ttk
-import keyboard  # pip install keyboard
+from ollama_client import get_client
+from response_cache import answer_key, get_cache
+from ring_buffer import AudioRingBuffer
+from model_controller import AdaptiveTranscriber
 
 # -------------------------------
 # CONFIG
@@ -21,13 +20,13 @@ SILENCE_THRESHOLD = 0.015
 MIN_SPEECH_DURATION = 2.0  # Minimum seconds of speech to process
 PROCESSING_INTERVAL = 4.0  # Process speech every 4 seconds
 HELP_HOTKEY = 'ctrl+h'  # Hotkey to trigger AI assistance
+MAX_BUFFER_DURATION = 30  # Maximum seconds to keep in buffer
 
-print("Loading Whisper model...")
-model = whisper.load_model("base")  # Better accuracy for meeting scenarios
-print("✅ Whisper model loaded!")
+# Loaded in the background by load_whisper() so the window comes up at once
+model = None
 
 # Queues and state
-audio_queue = queue.Queue()
+audio_ring = AudioRingBuffer(MAX_BUFFER_DURATION, SAMPLE_RATE)
 conversation_context = []
 recent_speech = deque(maxlen=50)  # Store recent conversations
 is_listening = True
@@ -62,7 +61,7 @@ class MeetingAssistantGUI:
         button_frame.pack(side=tk.RIGHT)
         
         self.help_button = ttk.Button(button_frame, text="🆘 Need Help (Ctrl+H)", 
-                                     command=self.request_help)
+                                     command=self.request_help, state='disabled')
         self.help_button.pack(side=tk.LEFT, padx=5)
         
         self.clear_button = ttk.Button(button_frame, text="🧹 Clear", 
@@ -120,6 +119,7 @@ class MeetingAssistantGUI:
     def request_help(self):
         global manual_help_requested
         manual_help_requested = True
+        audio_ring.wake()
         self.update_status("🔄 Processing recent conversation for help...", 'orange')
     
     def clear_conversation(self):
@@ -140,7 +140,7 @@ def is_silent(audio_data, threshold=SILENCE_THRESHOLD):
 def audio_callback(indata, frames, time, status):
     if status:
         print(f"Audio status: {status}")
-    audio_queue.put(indata.copy())
+    audio_ring.write(indata[:, 0])
 
 def transcribe_audio(audio_data):
     try:
@@ -164,15 +164,7 @@ def transcribe_audio(audio_data):
 # -------------------------------
 # AI ASSISTANCE
 # -------------------------------
-def get_ai_help(context_messages):
-    """Get AI help based on recent conversation context"""
-    
-    # Build context from recent messages
-    context = "Recent conversation context:\n"
-    for msg in context_messages[-10:]:  # Last 10 messages
-        context += f"- {msg}\n"
-    
-    prompt = f"""You are an AI meeting assistant. A person is confused during a conversation/meeting and needs help understanding what was discussed. 
+HELP_PROMPT = """You are an AI meeting assistant. A person is confused during a conversation/meeting and needs help understanding what was discussed. 
 
 {context}
 
@@ -185,35 +177,42 @@ Please provide a helpful response that:
 Focus on being helpful and clear, as if you're a knowledgeable colleague providing assistance during a meeting.
 
 Response:"""
+
+
+def get_ai_help(context_messages):
+    """Get AI help based on recent conversation context"""
+    
+    # Build context from recent messages
+    context = "Recent conversation context:\n"
+    for msg in context_messages[-10:]:  # Last 10 messages
+        context += f"- {msg}\n"
+    
+    prompt = HELP_PROMPT.format(context=context)
     
     # Call Gemma 2B via Ollama
-    ollama_url = "http://localhost:11434/api/generate"
-    payload = {
-        "model": "gemma:2b",
-        "prompt": prompt,
-        "stream": True,
-        "options": {
-            "temperature": 0.7,
-            "max_tokens": 300
-        }
+    client = get_client()
+    options = {
+        "temperature": 0.7,
+        "max_tokens": 300
     }
     
+    # The same recent conversation gets the same answer without another LLM call
+    key = answer_key(context, HELP_PROMPT, client.model, options)
+    cached = get_cache().get(key)
+    if cached is not None:
+        return cached
+
     response = ""
     try:
-        with requests.post(ollama_url, json=payload, stream=True, timeout=30) as r:
-            for line in r.iter_lines():
-                if line:
-                    try:
-                        data = json.loads(line.decode("utf-8"))
-                        piece = data.get("response", "")
-                        response += piece
-                        if data.get("done", False):
-                            break
-                    except json.JSONDecodeError:
-                        continue
-        return response.strip() if response.strip() else "No response generated."
+        for piece in client.stream_text(prompt, options=options, timeout=30):
+            response += piece
+        response = response.strip()
+        if not response:
+            return "No response generated."
+        get_cache().put(key, response)
+        return response
     except Exception as e:
-        return f"[AI Error: {str(e)}. Make sure Ollama is running with gemma:2b model.]"
+        return f"[AI Error: {str(e)}. Make sure Ollama is running with {client.model} model.]"
 
 # -------------------------------
 # MAIN AUDIO LOOP
@@ -221,26 +220,32 @@ Response:"""
 def audio_processing_loop():
     global manual_help_requested, is_listening
     
-    buffer = np.array([], dtype=np.int16)
     last_process_time = time.time()
     speech_start_time = None
     speaker_count = 1
+    last_position = 0
     
     print("🎤 Starting audio stream...")
     
     try:
+        import sounddevice as sd
         with sd.InputStream(samplerate=SAMPLE_RATE, channels=1, callback=audio_callback, 
                            blocksize=BLOCKSIZE, dtype=np.int16):
             
-            gui.update_status("🎧 Listening to conversation...", 'green')
+            if model:
+                gui.update_status("🎧 Listening to conversation...", 'green')
             
             while is_listening:
-                # Collect audio data from queue
-                while not audio_queue.empty():
-                    data = audio_queue.get()
-                    # Flatten the data to ensure 1D array
-                    data_flat = data.flatten()
-                    buffer = np.concatenate((buffer, data_flat))
+                # Block until the callback delivers a new block or help is requested
+                audio_ring.wait_for_data(last_position, timeout=1.0)
+                if model is None:
+                    # The ring keeps the latest audio until Whisper is ready; just move the clock on
+                    _, last_position = audio_ring.snapshot()
+                    continue
+
+                # View of the buffered audio, no copy
+                buffer, buffer_end = audio_ring.snapshot()
+                last_position = buffer_end
                 
                 current_time = time.time()
                 buffer_duration = len(buffer) / SAMPLE_RATE
@@ -266,8 +271,8 @@ def audio_processing_loop():
                                 if speaker_count > 10:
                                     speaker_count = 1
                             
-                            # Clear buffer after processing
-                            buffer = np.array([], dtype=np.int16)
+                            # Clear processed audio, keep what arrived meanwhile
+                            audio_ring.discard_until(buffer_end)
                             speech_start_time = None
                             gui.update_status("🎧 Listening to conversation...", 'green')
                     
@@ -276,8 +281,7 @@ def audio_processing_loop():
                         speech_start_time = None
                         # Keep some buffer but not too much
                         if buffer_duration > 10:  # Keep last 6 seconds if too long
-                            keep_samples = int(6 * SAMPLE_RATE)
-                            buffer = buffer[-keep_samples:]
+                            audio_ring.keep_last(6)
                 
                 # Handle manual help request
                 if manual_help_requested:
@@ -291,9 +295,6 @@ def audio_processing_loop():
                     
                     manual_help_requested = False
                 
-                # Small sleep to prevent excessive CPU usage
-                time.sleep(0.1)
-                
     except Exception as e:
         print(f"Audio processing error: {e}")
         gui.update_status(f"❌ Audio error: {str(e)}", 'red')
@@ -303,6 +304,7 @@ def audio_processing_loop():
 # -------------------------------
 def hotkey_listener():
     try:
+        import keyboard  # pip install keyboard
         keyboard.add_hotkey(HELP_HOTKEY, gui.request_help)
         print(f"✅ Hotkey {HELP_HOTKEY} registered")
         # Keep the hotkey listener alive
@@ -314,27 +316,43 @@ def hotkey_listener():
 # -------------------------------
 # MAIN ENTRY
 # -------------------------------
-def main():
-    global is_listening
-    
-    print("🚀 Starting Meeting AI Assistant")
+def load_whisper():
+    """Import Whisper/torch and load the model while the window and audio stream are already up"""
+    global model
+    gui.update_status("🔄 Loading Whisper model...", 'orange')
+    try:
+        # Climbs to the most accurate size this machine transcribes fast enough
+        model = AdaptiveTranscriber()
+    except Exception as e:
+        print(f"❌ Failed to load Whisper model: {e}")
+        gui.update_status(f"❌ Whisper failed to load: {e}", 'red')
+        return
+    print("✅ Whisper model loaded!")
+    gui.help_button.config(state='normal')
+    gui.update_status("🎧 Listening to conversation...", 'green')
     
     # Test Ollama connection
     try:
-        test_response = requests.get("http://localhost:11434/api/tags", timeout=5)
-        if test_response.status_code == 200:
-            print("✅ Ollama connection successful")
-        else:
-            print("⚠️ Ollama connection issue - make sure it's running")
+        get_client().tags(timeout=5)
+        print("✅ Ollama connection successful")
+    except requests.exceptions.HTTPError:
+        print("⚠️ Ollama connection issue - make sure it's running")
     except Exception as e:
         print(f"❌ Cannot connect to Ollama: {e}")
+
+def main():
+    global is_listening
+    
+    print("🚀 Starting Meeting AI Assistant")
     
     # Start threads
     audio_thread = threading.Thread(target=audio_processing_loop, daemon=True)
     hotkey_thread = threading.Thread(target=hotkey_listener, daemon=True)
+    loader_thread = threading.Thread(target=load_whisper, daemon=True)
     
     audio_thread.start()
     hotkey_thread.start()
+    loader_thread.start()
     
     try:
         # Run GUI main loop
@@ -343,6 +361,7 @@ def main():
         print("\n🛑 Shutting down...")
     finally:
         is_listening = False
+        audio_ring.wake()
         print("👋 Meeting Assistant stopped")
 
 if __name__ == "__main__":
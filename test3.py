@@ -1,15 +1,21 @@
-import whisper
 import requests
-import sounddevice as sd
 import numpy as np
 import queue
 import json
 import time
 import threading
-from collections import deque
+from collections import namedtuple
 import tkinter as tk
 from tkinter import scrolledtext, ttk, messagebox
-import keyboard  # pip install keyboard
+from conversation_memory import ConversationMemory, ollama_summarizer
+from ollama_client import ModelKeeper, get_client
+from response_cache import answer_key, get_cache
+from ring_buffer import AudioRingBuffer
+from model_controller import AdaptiveTranscriber
+from vad import Endpointer, create_vad
+from streaming_transcriber import StreamingTranscriber, words_from_result
+from pipeline import AudioChunk, BoundedQueue, COALESCE, Worker, merge_audio_chunks
+from live_monitor import LiveMonitor, format_status
 import sys
 import traceback
 
@@ -18,19 +24,47 @@ import traceback
 # -------------------------------
 SAMPLE_RATE = 16000
 BLOCKSIZE = 1024
-SILENCE_THRESHOLD = 0.02  # Increased for better noise handling
-MIN_SPEECH_DURATION = 1.5  # Reduced for faster response
+VAD_BACKEND = 'energy'  # 'energy', 'webrtc' (pip install webrtcvad) or 'silero' (needs torch)
+SPEECH_HANGOVER_MS = 600  # Trailing silence that ends an utterance
+MAX_UTTERANCE_DURATION = 15  # Transcribe long monologues in pieces of at most this many seconds
+STREAMING_TRANSCRIPTION = True  # Show partial text while someone is still talking
 PROCESSING_INTERVAL = 3.0  # Faster processing
 HELP_HOTKEY = 'ctrl+h'
 MAX_BUFFER_DURATION = 30  # Maximum seconds to keep in buffer
+TRANSCRIPTION_QUEUE_SIZE = 8  # Utterances waiting for Whisper before the oldest is dropped
+LLM_QUEUE_SIZE = 2  # AI requests waiting for Gemma; bursts are merged into one
+MEETING_CONTEXT_TOKENS = 600  # recent speech kept verbatim for help; older speech is summarized
 
 # Global variables
-audio_queue = queue.Queue()
-recent_speech = deque(maxlen=20)  # Reduced for better performance
+# The ring holds at most MAX_BUFFER_DURATION seconds; older audio is overwritten
+audio_ring = AudioRingBuffer(MAX_BUFFER_DURATION, SAMPLE_RATE)
+recent_speech = ConversationMemory(MEETING_CONTEXT_TOKENS, ollama_summarizer(), line_format="• {role}: {content}")
 is_listening = True
-manual_help_requested = False
+speaker_count = 1
 model = None
 gui = None
+model_keeper = None  # preloads Gemma and keeps it resident while listening
+live_monitor = None  # real-time factor, queue lag, dropped audio and LLM latency
+
+# Pipeline: capture -> segmenter -> transcription worker -> LLM worker.
+# Each stage has its own bounded queue, so a slow Gemma reply never stalls
+# speech recognition and a slow transcription never stalls capture.
+AiRequest = namedtuple("AiRequest", "kind messages")
+
+def merge_ai_requests(last, new):
+    if new.kind == 'help':
+        return new  # a help request already covers the whole recent conversation
+    if last.kind == 'auto' and new.kind == 'auto':
+        return AiRequest('auto', last.messages + new.messages)
+    return None
+
+def audio_chunk_dropped(chunk):
+    if live_monitor:
+        live_monitor.record_dropped(len(chunk.audio) / SAMPLE_RATE)
+
+transcription_queue = BoundedQueue(TRANSCRIPTION_QUEUE_SIZE, COALESCE, merge_audio_chunks,
+                                   name="transcription", on_drop=audio_chunk_dropped)
+llm_queue = BoundedQueue(LLM_QUEUE_SIZE, COALESCE, merge_ai_requests, name="llm")
 
 # -------------------------------
 # INITIALIZATION
@@ -39,28 +73,33 @@ def initialize_whisper():
     global model
     try:
         print("🔄 Loading Whisper model...")
-        model = whisper.load_model("tiny")  # Using tiny for faster processing
+        # Starts on the smallest of WHISPER_SIZES and moves up while transcription stays fast enough
+        model = AdaptiveTranscriber(on_switch=whisper_switched)
         print("✅ Whisper model loaded successfully!")
         return True
     except Exception as e:
         print(f"❌ Failed to load Whisper model: {e}")
         return False
 
+def whisper_switched(size):
+    """Called by the adaptive transcriber once a bigger or smaller model took over"""
+    if live_monitor:
+        live_monitor.model_size = size
+
 def test_ollama_connection():
     try:
-        response = requests.get("http://localhost:11434/api/tags", timeout=12)
-        if response.status_code == 200:
-            models = response.json().get("models", [])
-            gemma_available = any("gemma" in model.get("name", "") for model in models)
-            if gemma_available:
-                print("✅ Ollama connection successful - Gemma model found")
-                return True
-            else:
-                print("⚠️ Ollama connected but Gemma model not found")
-                return False
+        client = get_client()
+        models = client.tags(timeout=12)
+        gemma_available = client.has_model(models)
+        if gemma_available:
+            print(f"✅ Ollama connection successful - {client.model} model found")
+            return True
         else:
-            print(f"⚠️ Ollama responded with status {response.status_code}")
+            print(f"⚠️ Ollama connected but {client.model} model not found")
             return False
+    except requests.exceptions.HTTPError as e:
+        print(f"⚠️ Ollama responded with status {e.response.status_code}")
+        return False
     except Exception as e:
         print(f"❌ Cannot connect to Ollama: {e}")
         return False
@@ -100,6 +139,9 @@ class MeetingAssistantGUI:
                                      font=('Arial', 11))
         self.status_label.pack(side=tk.LEFT)
 
+        self.metrics_label = ttk.Label(status_frame, text="", font=('Arial', 9), foreground='gray')
+        self.metrics_label.pack(side=tk.LEFT, padx=(15, 0))
+
         # Control buttons and language dropdown
         button_frame = ttk.Frame(status_frame)
         button_frame.pack(side=tk.RIGHT)
@@ -158,7 +200,7 @@ class MeetingAssistantGUI:
         def check_updates():
             try:
                 while True:
-                    update_func, args = self.update_queue.get(timeout=0.1)
+                    update_func, args = self.update_queue.get_nowait()
                     update_func(*args)
             except queue.Empty:
                 pass
@@ -176,7 +218,31 @@ class MeetingAssistantGUI:
     def update_status(self, text, color='black'):
         self.thread_safe_update(self._update_status, text, color)
     
+    def _update_metrics(self, text, color):
+        self.metrics_label.config(text=text, foreground=color)
+    
+    def update_metrics(self, snapshot):
+        self.thread_safe_update(self._update_metrics, *format_status(snapshot))
+    
+    def _clear_partial(self):
+        if self.conversation_text.tag_ranges("partial"):
+            self.conversation_text.delete("partial.first", "partial.last")
+    
+    def _show_partial(self, speaker, text):
+        self._clear_partial()
+        self.conversation_text.tag_config("partial", foreground='gray')
+        self.conversation_text.insert(tk.END, f"[...] {speaker}: {text}\n\n", "partial")
+        self.conversation_text.see(tk.END)
+    
+    def show_partial(self, speaker, text):
+        """Show a tentative transcript that the next partial or final line replaces"""
+        self.thread_safe_update(self._show_partial, speaker, text)
+    
+    def clear_partial(self):
+        self.thread_safe_update(self._clear_partial)
+    
     def _add_conversation(self, speaker, text):
+        self._clear_partial()
         timestamp = time.strftime("%H:%M:%S")
         self.conversation_text.insert(tk.END, f"[{timestamp}] {speaker}: {text}\n\n")
         self.conversation_text.see(tk.END)
@@ -199,8 +265,7 @@ class MeetingAssistantGUI:
         self.thread_safe_update(self._enable_help_button)
     
     def request_help(self):
-        global manual_help_requested
-        manual_help_requested = True
+        request_ai_help()
         self.update_status("🔄 Processing recent conversation for help...", 'orange')
     
     def clear_conversation(self):
@@ -213,6 +278,7 @@ class MeetingAssistantGUI:
         def test():
             try:
                 self.update_status("🎙️ Testing audio... Speak now!", 'blue')
+                import sounddevice as sd
                 # Record 3 seconds of audio
                 duration = 3
                 recording = sd.rec(int(duration * SAMPLE_RATE), 
@@ -243,15 +309,37 @@ class MeetingAssistantGUI:
 # -------------------------------
 # AUDIO PROCESSING
 # -------------------------------
-def is_silent(audio_data, threshold=SILENCE_THRESHOLD):
-    if len(audio_data) == 0:
-        return True
-    return np.mean(np.abs(audio_data.astype(np.float32))) < threshold
-
 def audio_callback(indata, frames, time, status):
     if status:
         print(f"Audio status: {status}")
-    audio_queue.put(indata.copy())
+    audio_ring.write(indata[:, 0])
+
+def current_language():
+    # Only allow 'en' or 'hi' as language
+    lang = gui.selected_language.get() if gui and hasattr(gui, 'selected_language') else 'en'
+    if lang not in ("en", "hi"):
+        lang = "en"
+    return lang
+
+def clean_transcript(text):
+    text = text.strip()
+    # Filter out very short or meaningless transcriptions
+    if len(text) < 5 or text.lower() in ["thank you.", "thanks.", "hmm.", "uh.", "um."]:
+        return ""
+    return text
+
+def transcribe_words(audio_float, prompt):
+    """Word-timestamped pass used by the streaming transcriber"""
+    result = model.transcribe(
+        audio_float,
+        language=current_language(),
+        fp16=False,
+        no_speech_threshold=0.6,
+        condition_on_previous_text=False,
+        initial_prompt=prompt or "This is a meeting conversation.",
+        word_timestamps=True
+    )
+    return words_from_result(result)
 
 def transcribe_audio(audio_data):
     try:
@@ -268,27 +356,16 @@ def transcribe_audio(audio_data):
         if len(audio_float) < SAMPLE_RATE:  # Less than 1 second
             return ""
         
-        # Only allow 'en' or 'hi' as language
-        lang = gui.selected_language.get() if gui and hasattr(gui, 'selected_language') else 'en'
-        if lang not in ("en", "hi"):
-            lang = "en"
         result = model.transcribe(
             audio_float, 
-            language=lang,
+            language=current_language(),
             fp16=False,
             no_speech_threshold=0.6,
             condition_on_previous_text=False,
             initial_prompt="This is a meeting conversation."
         )
         
-        text = result["text"].strip()
-        confidence = result.get("language", "")
-        
-        # Filter out very short or meaningless transcriptions
-        if len(text) < 5 or text.lower() in ["thank you.", "thanks.", "hmm.", "uh.", "um."]:
-            return ""
-            
-        return text
+        return clean_transcript(result["text"])
         
     except Exception as e:
         print(f"Transcription error: {e}")
@@ -297,16 +374,7 @@ def transcribe_audio(audio_data):
 # -------------------------------
 # AI ASSISTANCE
 # -------------------------------
-def get_ai_help(context_messages):
-    if not context_messages:
-        return "No recent conversation to analyze."
-    
-    # Build context from recent messages
-    context = "Recent meeting conversation:\n"
-    for msg in context_messages[-8:]:  # Last 8 messages for context
-        context += f"• {msg}\n"
-    
-    prompt = f"""You are an AI meeting assistant helping someone who got confused during a conversation.
+HELP_PROMPT = """You are an AI meeting assistant helping someone who got confused during a conversation.
 
 {context}
 
@@ -317,111 +385,109 @@ Please provide a helpful response that:
 4. Keep it concise (2-3 sentences max)
 
 Be helpful and practical, like a knowledgeable colleague whispering advice."""
+
+
+def get_ai_help(conversation):
+    if not conversation:
+        return "No recent conversation to analyze."
+    
+    # Lines are already bulleted and kept within MEETING_CONTEXT_TOKENS by the memory
+    context = f"Recent meeting conversation:\n{conversation}\n"
     
-    ollama_url = "http://localhost:11434/api/generate"
-    payload = {
-        "model": "gemma:2b",
-        "prompt": prompt,
-        "stream": False,  # Non-streaming for reliability
-        "options": {
-            "temperature": 0.3,  # Lower temperature for more focused responses
-            "max_tokens": 200,
-            "top_p": 0.9
-        }
+    prompt = HELP_PROMPT.format(context=context)
+    
+    options = {
+        "temperature": 0.3,  # Lower temperature for more focused responses
+        "max_tokens": 200,
+        "top_p": 0.9
     }
     
     try:
-        response = requests.post(ollama_url, json=payload, timeout=15)
-        if response.status_code == 200:
-            result = response.json()
-            ai_response = result.get("response", "").strip()
-            return ai_response if ai_response else "Sorry, couldn't generate a helpful response."
-        else:
-            return f"Error: Ollama returned status {response.status_code}"
+        # Non-streaming for reliability
+        client = get_client()
+        # The same recent conversation gets the same answer without another LLM call
+        key = answer_key(context, HELP_PROMPT, client.model, options)
+        cached = get_cache().get(key)
+        if cached is not None:
+            return cached
+        # Don't let the 15 s timeout race Gemma's first load
+        if model_keeper and not model_keeper.wait_ready():
+            return f"Error: {client.model} not loaded ({model_keeper.last_error or 'still loading'})."
+        start = time.perf_counter()
+        result = client.generate(prompt, options=options, timeout=15)
+        if live_monitor:
+            live_monitor.record_llm(time.perf_counter() - start)
+        ai_response = result.get("response", "").strip()
+        if not ai_response:
+            return "Sorry, couldn't generate a helpful response."
+        get_cache().put(key, ai_response)
+        return ai_response
+    except requests.exceptions.HTTPError as e:
+        return f"Error: Ollama returned status {e.response.status_code}"
     except requests.exceptions.Timeout:
         return "Error: Request timed out. Ollama might be busy."
     except Exception as e:
         return f"Error connecting to AI: {str(e)}"
 
 # -------------------------------
-# MAIN AUDIO LOOP
+# SEGMENTER STAGE
 # -------------------------------
 def audio_processing_loop():
-    global manual_help_requested, is_listening
+    """Cut captured audio into utterances and hand them to the transcription worker"""
+    global is_listening
     
-    buffer = np.array([], dtype=np.int16)
-    last_activity_time = time.time()
-    speaker_count = 1
+    endpointer = Endpointer(create_vad(VAD_BACKEND, SAMPLE_RATE),
+                            hangover_ms=SPEECH_HANGOVER_MS,
+                            max_utterance_s=MAX_UTTERANCE_DURATION)
+    streamed_position = None  # how far into the open utterance we've sent audio
+    utterance_id = 0
+    last_position = 0
     
     gui.update_status("🎤 Starting audio stream...", 'blue')
     
     try:
+        import sounddevice as sd
         with sd.InputStream(samplerate=SAMPLE_RATE, channels=1, callback=audio_callback, 
                            blocksize=BLOCKSIZE, dtype=np.int16):
             
-            gui.update_status("🎧 Listening to conversation...", 'green')
-            gui.enable_help_button()
+            if model:
+                gui.update_status("🎧 Listening to conversation...", 'green')
+            else:
+                # Captured speech queues up until the model is ready
+                gui.update_status("🎧 Listening - Whisper is still loading...", 'orange')
             
             while is_listening:
                 try:
-                    # Collect audio data from queue
-                    audio_collected = False
-                    while not audio_queue.empty():
-                        data = audio_queue.get_nowait()
-                        data_flat = data.flatten()
-                        buffer = np.concatenate((buffer, data_flat))
-                        audio_collected = True
-                    
-                    current_time = time.time()
-                    buffer_duration = len(buffer) / SAMPLE_RATE
-                    
-                    # Process speech detection and transcription
-                    if buffer_duration >= MIN_SPEECH_DURATION:
-                        if not is_silent(buffer):
-                            gui.update_status("🎙️ Speech detected, processing...", 'orange')
-
-                            # Transcribe the audio
-                            transcript = transcribe_audio(buffer)
-
-                            if transcript:
-                                speaker_name = f"Speaker {speaker_count}"
-                                gui.add_conversation(speaker_name, transcript)
-                                recent_speech.append(f"{speaker_name}: {transcript}")
-
-                                # Instantly get AI response for each question
-                                gui.update_status("🤖 Thinking...", 'blue')
-                                ai_response = get_ai_help([f"{speaker_name}: {transcript}"])
-                                gui.show_ai_response(ai_response)
-                                gui.update_status("🎧 Listening to conversation...", 'green')
-
-                                speaker_count = (speaker_count % 2) + 1  # Cycle through 2 speakers
-                                last_activity_time = current_time
-
-                            # Clear buffer after processing
-                            buffer = np.array([], dtype=np.int16)
-                        elif buffer_duration > 10:  # Clear old silent audio
-                            buffer = buffer[-int(2 * SAMPLE_RATE):]  # Keep last 2 seconds
+                    # Block until the callback delivers a new block
+                    audio_ring.wait_for_data(last_position, timeout=1.0)
+
+                    # Run the endpointer over the new frames only
+                    new_audio, last_position = audio_ring.since(last_position)
+                    utterances = endpointer.update(new_audio, last_position)
                     
-                    # Handle manual help request
-                    if manual_help_requested:
-                        if recent_speech:
-                            gui.update_status("🤖 Getting AI help...", 'blue')
-                            ai_response = get_ai_help(list(recent_speech))
-                            gui.show_ai_response(ai_response)
-                            gui.update_status("🎧 Listening to conversation...", 'green')
+                    # Queue each utterance as soon as its trailing silence is heard.
+                    # Chunks are copied out of the ring since they outlive the view.
+                    for utterance in utterances:
+                        if STREAMING_TRANSCRIPTION:
+                            # The worker already has the start; send only the rest
+                            start = utterance.start_sample if streamed_position is None else streamed_position
+                            # After a max-length cut the next utterance picks up where we stopped
+                            streamed_position = max(start, utterance.end_sample) if endpointer.in_speech else None
                         else:
-                            gui.show_ai_response("No recent conversation to analyze. Start speaking to capture audio.")
-                        
-                        manual_help_requested = False
+                            start = utterance.start_sample
+                        audio = audio_ring.span(start, utterance.end_sample).copy()
+                        transcription_queue.put(AudioChunk(utterance_id, audio, True))
+                        utterance_id += 1
                     
-                    # Prevent memory overflow
-                    if buffer_duration > MAX_BUFFER_DURATION:
-                        buffer = buffer[-int(10 * SAMPLE_RATE):]  # Keep last 10 seconds
+                    # Stream the open utterance for partial results
+                    if STREAMING_TRANSCRIPTION and endpointer.in_speech:
+                        if streamed_position is None:
+                            streamed_position = endpointer.utterance_start
+                        audio = audio_ring.span(streamed_position, last_position).copy()
+                        streamed_position = last_position
+                        if len(audio):
+                            transcription_queue.put(AudioChunk(utterance_id, audio, False))
                     
-                    time.sleep(0.05)  # Reduced sleep for better responsiveness
-                    
-                except queue.Empty:
-                    continue
                 except Exception as e:
                     print(f"Audio loop error: {e}")
                     time.sleep(0.1)
@@ -430,16 +496,85 @@ def audio_processing_loop():
         print(f"Audio stream error: {e}")
         gui.update_status(f"❌ Audio error: {str(e)}", 'red')
 
+# -------------------------------
+# TRANSCRIPTION STAGE
+# -------------------------------
+streaming = StreamingTranscriber(transcribe_words, SAMPLE_RATE) if STREAMING_TRANSCRIPTION else None
+streaming_utterance = None
+
+def queued_audio_seconds():
+    return sum(len(chunk.audio) for chunk in transcription_queue.items()) / SAMPLE_RATE
+
+def transcription_stage(chunk):
+    start = time.perf_counter()
+    try:
+        handle_chunk(chunk)
+    finally:
+        # Processing time against the audio it covered: above 1x the queue keeps growing
+        live_monitor.record_transcription(len(chunk.audio) / SAMPLE_RATE, time.perf_counter() - start)
+
+def handle_chunk(chunk):
+    global speaker_count, streaming_utterance
+    
+    audio_float = chunk.audio.astype(np.float32) / 32768.0
+    if streaming:
+        if streaming_utterance != chunk.utterance_id:
+            # The previous utterance's final chunk was dropped under load
+            streaming.reset()
+            streaming_utterance = chunk.utterance_id
+        event = streaming.insert_audio(audio_float)
+        if not chunk.final:
+            if event and event.text:
+                gui.show_partial(f"Speaker {speaker_count}", event.text)
+            return
+        gui.update_status("🎙️ Speech detected, processing...", 'orange')
+        transcript = clean_transcript(streaming.finish().text)
+        streaming_utterance = None
+    else:
+        gui.update_status("🎙️ Speech detected, processing...", 'orange')
+        transcript = transcribe_audio(chunk.audio)
+    
+    if transcript:
+        speaker_name = f"Speaker {speaker_count}"
+        gui.add_conversation(speaker_name, transcript)
+        recent_speech.add(speaker_name, transcript)
+        
+        # Instantly get AI response for each question, without waiting on Gemma here
+        llm_queue.put(AiRequest('auto', [f"{speaker_name}: {transcript}"]))
+        
+        speaker_count = (speaker_count % 2) + 1  # Cycle through 2 speakers
+    else:
+        gui.clear_partial()
+    
+    gui.update_status("🎧 Listening to conversation...", 'green')
+
+# -------------------------------
+# LLM STAGE
+# -------------------------------
+def request_ai_help():
+    llm_queue.put(AiRequest('help', None))
+
+def llm_stage(request):
+    if request.kind == 'help':
+        if recent_speech:
+            gui.update_status("🤖 Getting AI help...", 'blue')
+            ai_response = get_ai_help(recent_speech.render())
+            gui.show_ai_response(ai_response)
+            gui.update_status("🎧 Listening to conversation...", 'green')
+        else:
+            gui.show_ai_response("No recent conversation to analyze. Start speaking to capture audio.")
+    else:
+        gui.update_status("🤖 Thinking...", 'blue')
+        gui.show_ai_response(get_ai_help("\n".join(f"• {msg}" for msg in request.messages)))
+        gui.update_status("🎧 Listening to conversation...", 'green')
+
 # -------------------------------
 # HOTKEY HANDLER
 # -------------------------------
 def setup_hotkeys():
     try:
-        def on_help_request():
-            global manual_help_requested
-            manual_help_requested = True
-        
-        keyboard.add_hotkey(HELP_HOTKEY, on_help_request, suppress=False)
+        import keyboard  # pip install keyboard
+        keyboard.add_hotkey(HELP_HOTKEY, request_ai_help, suppress=False)
         print(f"✅ Hotkey {HELP_HOTKEY} registered")
         return True
     except Exception as e:
@@ -449,42 +584,57 @@ def setup_hotkeys():
 # -------------------------------
 # MAIN FUNCTION
 # -------------------------------
+def load_models(transcription_worker):
+    """Import Whisper/torch, load the model, register hotkeys and check Ollama off the Tk thread"""
+    gui.update_status("🔄 Loading Whisper (the first start also imports torch)...", 'orange')
+    if not initialize_whisper():
+        gui.update_status("❌ Whisper failed to load - pip install openai-whisper", 'red')
+        gui.thread_safe_update(messagebox.showerror, "Error",
+                               "Failed to load Whisper model. Please install it:\npip install openai-whisper")
+        return
+    live_monitor.model_size = model.size
+    transcription_worker.start()
+    gui.enable_help_button()
+    
+    hotkeys = setup_hotkeys()
+    
+    if not test_ollama_connection():
+        gui.thread_safe_update(messagebox.showwarning, "Ollama Not Ready",
+                               "Ollama is not running or Gemma model not found.\n\n"
+                               "Transcription keeps running; AI help works once Ollama is up.")
+    
+    print("✅ All systems ready!")
+    if hotkeys:
+        gui.update_status("✅ Ready! Press Ctrl+H for help or click 'Test Audio'", 'green')
+    else:
+        gui.update_status("⚠️ Ready, but hotkeys are unavailable - use the Help button instead", 'orange')
+
 def main():
-    global is_listening, gui
+    global is_listening, gui, model_keeper, live_monitor
     
     print("🚀 Starting Meeting AI Assistant")
     print("="*50)
     
     # Initialize GUI
     gui = MeetingAssistantGUI()
-    
-    # Initialize Whisper
-    if not initialize_whisper():
-        messagebox.showerror("Error", "Failed to load Whisper model. Please install it:\npip install openai-whisper")
-        return
-    
-    # Test Ollama
-    if not test_ollama_connection():
-        response = messagebox.askyesno("Ollama Not Ready", 
-                                     "Ollama is not running or Gemma model not found.\n\n"
-                                     "Do you want to continue anyway?\n"
-                                     "(You can still test audio transcription)")
-        if not response:
-            return
-    
 
-    # Setup hotkeys
-    hotkey_success = setup_hotkeys()
-    if not hotkey_success:
-        gui.update_status("⚠️ Hotkeys unavailable - use button instead", 'orange')
+    # Load Gemma in the background while Whisper loads
+    model_keeper = ModelKeeper(on_status=gui.update_status).start()
     
-    # Start audio processing
+    # Live RTF/queue/LLM numbers next to the status
+    live_monitor = LiveMonitor(None, queued_audio_seconds, on_update=gui.update_metrics).start()
+    
+    # Capture starts right away; transcription starts once Whisper has loaded
+    workers = [
+        Worker("Transcription worker", transcription_queue, transcription_stage),
+        Worker("LLM worker", llm_queue, llm_stage),
+    ]
+    workers[1].start()
     audio_thread = threading.Thread(target=audio_processing_loop, daemon=True)
     audio_thread.start()
+    threading.Thread(target=load_models, args=(workers[0],), name="model-loader", daemon=True).start()
     
     try:
-        print("✅ All systems ready!")
-        gui.update_status("✅ Ready! Press Ctrl+H for help or click 'Test Audio'", 'green')
         gui.root.mainloop()
     except KeyboardInterrupt:
         print("\n🛑 Shutting down...")
@@ -493,6 +643,11 @@ def main():
         traceback.print_exc()
     finally:
         is_listening = False
+        model_keeper.stop()
+        live_monitor.stop()
+        audio_ring.wake()
+        for worker in workers:
+            worker.stop()
         print("👋 Meeting Assistant stopped")
 
 if __name__ == "__main__":
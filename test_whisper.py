@@ -1,10 +1,9 @@
-import whisper
-import requests
-import json
 import sounddevice as sd
 from scipy.io.wavfile import write
 import tempfile
 import os
+from ollama_client import get_client
+from transcriber import get_transcriber
 
 def ask_question_via_voice():
     """Complete workflow: record -> transcribe -> ask Gemma"""
@@ -36,7 +35,7 @@ def ask_question_via_voice():
     try:
         # Transcribe
         print(f"🔄 Transcribing as {lang_name}...")
-        model = whisper.load_model("medium")
+        model = get_transcriber("medium")
         result = model.transcribe(temp_path, language=lang_choice)
         question = result["text"].strip()
 
@@ -48,17 +47,7 @@ def ask_question_via_voice():
 
         # Ask Gemma
         print("🤖 Gemma is thinking...")
-        ollama_url = "http://localhost:11434/api/generate"
-        payload = {
-            "model": "gemma:2b",
-            "prompt": f"Answer this question concisely: {question}",
-            "stream": False  
-        }
-
-        response = requests.post(ollama_url, json=payload)
-        response.raise_for_status()
-
-        result = response.json()
+        result = get_client().generate(f"Answer this question concisely: {question}")
         answer = result.get("response", "No response received")
 
         print("\n" + "="*50)
@@ -0,0 +1,219 @@
+import io
+import json
+import wave
+
+import numpy as np
+import pytest
+
+pytest.importorskip("flask")
+
+import ask_api
+from response_cache import ResponseCache
+import transcriber
+
+
+def wav_bytes(seconds, rate=16000):
+    buf = io.BytesIO()
+    with wave.open(buf, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(np.zeros(int(seconds * rate), dtype='<i2').tobytes())
+    return buf.getvalue()
+
+
+class FakeTranscriber:
+    """Answers every window with its length in seconds."""
+
+    def __init__(self):
+        self.batches = []
+
+    def transcribe_batch(self, windows, language=None):
+        self.batches.append(len(windows))
+        return [f"{len(w) / 16000:g}s" for w in windows]
+
+
+@pytest.fixture
+def model(monkeypatch):
+    fake = FakeTranscriber()
+    monkeypatch.setattr(transcriber, 'get_transcriber', lambda *args, **kwargs: fake)
+    monkeypatch.setattr(ask_api, 'pool', None)
+    return fake
+
+
+def events(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_batch_streams_one_event_per_upload(model):
+    uploads = [(io.BytesIO(wav_bytes(s)), f'clip{n}.wav') for n, s in enumerate((1, 2, 45, 3))]
+    uploads.append((io.BytesIO(b''), 'empty.wav'))
+    response = ask_api.app.test_client().post(
+        '/transcribe/batch', data={'audio': uploads, 'batch_size': '2'},
+        content_type='multipart/form-data')
+    assert response.status_code == 200
+    lines = events(response)
+    assert [e['type'] for e in lines] == ['file'] * 5 + ['done']
+    assert [e['file'] for e in lines[:5]] == ['clip0.wav', 'clip1.wav', 'clip2.wav', 'clip3.wav', 'empty.wav']
+    assert lines[0]['text'] == '1s' and lines[2]['text'] == '30s 15s' and lines[2]['windows'] == 2
+    assert 'error' in lines[4]
+    assert lines[-1] == {'type': 'done', 'files': 5}
+    assert model.batches == [2, 2, 1]
+
+
+def test_batch_uses_the_worker_pool(monkeypatch):
+    def no_local_model(*args, **kwargs):
+        raise AssertionError('loaded a model in the server process')
+
+    fake = FakeTranscriber()
+    monkeypatch.setattr(transcriber, 'get_transcriber', no_local_model)
+    monkeypatch.setattr(ask_api, 'pool', fake)
+    response = ask_api.app.test_client().post(
+        '/transcribe/batch', data={'audio': [(io.BytesIO(wav_bytes(1)), 'a.wav')]},
+        content_type='multipart/form-data')
+    assert [e['type'] for e in events(response)] == ['file', 'done']
+    assert fake.batches == [1]
+
+
+def test_batch_validates_the_form(model):
+    client = ask_api.app.test_client()
+    assert client.post('/transcribe/batch', data={}).status_code == 400
+    response = client.post('/transcribe/batch', content_type='multipart/form-data',
+                           data={'audio': (io.BytesIO(wav_bytes(1)), 'a.wav'), 'batch_size': 'many'})
+    assert response.status_code == 400
+
+
+class FakeModel:
+    def __init__(self):
+        self.calls = 0
+
+    def transcribe(self, audio, language=None):
+        self.calls += 1
+        return {'text': f'{len(audio)} samples'}
+
+
+@pytest.fixture
+def transcripts(monkeypatch):
+    cache = ResponseCache(max_entries=16, ttl=0, path='')
+    monkeypatch.setattr(ask_api, 'get_transcript_cache', lambda: cache)
+    return cache
+
+
+def test_raw_pcm_cache_respects_the_layout(transcripts):
+    model = FakeModel()
+    data = np.arange(1600, dtype='>i2').tobytes()
+    upload = lambda mimetype, params, sample_rate=None: ask_api.transcribe_upload(
+        model, data, mimetype, params, sample_rate, 'a.raw', 'en')
+
+    assert upload('audio/L16', {'rate': '8000'}) == '3200 samples'
+    assert upload('audio/L16', {'rate': '8000'}) == '3200 samples'
+    assert model.calls == 1  # identical request, served from the raw-bytes key
+
+    with pytest.raises(ask_api.AskError, match='Unsupported raw PCM sample rate'):
+        upload('audio/L16', {'rate': '44100'})
+    with pytest.raises(ask_api.AskError, match='channel count'):
+        upload('audio/L16', {'rate': '8000', 'channels': 'abc'})
+    with pytest.raises(ask_api.AskError, match='sample rate'):
+        upload('audio/L16', {}, sample_rate='0')
+
+    # Same bytes, other byte order: a different signal, so a fresh transcription
+    model.transcribe = lambda audio, language=None: {'text': 'little-endian'}
+    assert upload('audio/pcm', {'rate': '8000'}) == 'little-endian'
+
+
+def test_wav_cache_ignores_the_mimetype(transcripts):
+    model = FakeModel()
+    data = wav_bytes(1)
+    assert ask_api.transcribe_upload(model, data, 'audio/wav', {}, None, 'a.wav', 'en') == '16000 samples'
+    assert ask_api.transcribe_upload(model, data, 'audio/x-wav', {}, None, 'a.wav', 'en') == '16000 samples'
+    assert model.calls == 1
+
+
+class QuestionModel:
+    def transcribe(self, audio, language=None):
+        return {'text': ' What is the capital of France? '}
+
+
+class FakeClient:
+    model = 'gemma'
+
+    def __init__(self, pieces=('Par', 'is'), error=None):
+        self.pieces = pieces
+        self.error = error
+        self.streams = 0
+
+    def stream_generate(self, prompt):
+        self.streams += 1
+        for piece in self.pieces:
+            yield {'response': piece, 'done': False}
+        if self.error:
+            raise self.error
+        yield {'response': '', 'done': True, 'eval_duration': 10 ** 9}
+
+
+@pytest.fixture
+def asking(monkeypatch, transcripts):
+    client = FakeClient()
+    monkeypatch.setattr(transcriber, 'get_transcriber', lambda *args, **kwargs: QuestionModel())
+    monkeypatch.setattr(ask_api, 'pool', None)
+    monkeypatch.setattr(ask_api, 'get_client', lambda: client)
+    answers = ResponseCache(max_entries=16, ttl=0, path='')
+    monkeypatch.setattr(ask_api, 'get_cache', lambda: answers)
+    return client
+
+
+def ask_stream(headers=None, **form):
+    form['audio'] = (io.BytesIO(wav_bytes(1)), 'q.wav')
+    return ask_api.app.test_client().post('/ask/stream', data=form, headers=headers,
+                                          content_type='multipart/form-data')
+
+
+def test_ask_stream_sends_question_tokens_and_done(asking):
+    response = ask_stream()
+    assert response.mimetype == 'application/x-ndjson'
+    lines = events(response)
+    assert lines[0] == {'type': 'question', 'question': 'What is the capital of France?'}
+    assert [e['token'] for e in lines[1:-1]] == ['Par', 'is']
+    assert lines[-1]['type'] == 'done' and lines[-1]['answer'] == 'Paris'
+    assert 'llm' in lines[-1]['timings_ms'] and 'transcribe' in lines[-1]['timings_ms']
+
+    # The same question again is answered from the cache in one token
+    lines = events(ask_stream())
+    assert [e['type'] for e in lines] == ['question', 'token', 'done']
+    assert lines[-1]['cached'] is True and lines[-1]['answer'] == 'Paris'
+    assert asking.streams == 1
+
+
+def test_ask_stream_as_server_sent_events(asking):
+    response = ask_stream(headers={'Accept': 'text/event-stream'})
+    assert response.mimetype == 'text/event-stream'
+    blocks = response.get_data(as_text=True).strip().split('\n\n')
+    assert [b.splitlines()[0] for b in blocks] == ['event: question', 'event: token', 'event: token', 'event: done']
+    assert json.loads(blocks[-1].splitlines()[1][len('data: '):])['answer'] == 'Paris'
+    assert ask_stream(format='sse').mimetype == 'text/event-stream'
+
+
+def test_ask_stream_reports_errors_in_band(asking):
+    asking.error = RuntimeError('connection reset')
+    lines = events(ask_stream())
+    assert [e['type'] for e in lines] == ['question', 'token', 'token', 'error']
+    assert lines[-1]['error'] == 'connection reset'
+
+
+def test_ask_stream_rejects_bad_forms(asking):
+    client = ask_api.app.test_client()
+    response = client.post('/ask/stream', data={}, content_type='multipart/form-data')
+    assert response.status_code == 400 and response.get_json()['error'] == 'No audio file uploaded'
+    assert ask_stream(language='fr').status_code == 400
+
+
+def test_metrics_endpoint_reports_stages_and_requests(asking):
+    ask_stream().get_data()
+    response = ask_api.app.test_client().get('/metrics')
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    text = response.get_data(as_text=True)
+    assert 'ask_requests_total{endpoint="ask_stream",status="200"}' in text
+    assert 'ask_stage_seconds_count{stage="transcribe"}' in text
+    assert 'ask_stage_seconds_count{stage="llm"}' in text
+    assert 'ollama_eval_seconds_count ' in text
+    assert 'transcribe_queue_depth 0' in text
@@ -0,0 +1,54 @@
+import io
+import wave
+
+import numpy as np
+import pytest
+
+from audio_io import decode_audio_bytes, decode_wav_bytes, pcm_to_float32, resample_to_whisper
+
+
+def test_l16_is_big_endian():
+    samples = np.array([1000, -2000, 32767], dtype='>i2').tobytes()
+    audio = decode_audio_bytes(samples, 'audio/L16', {'rate': '16000'})
+    assert np.allclose(audio * 32768, [1000, -2000, 32767])
+
+
+@pytest.mark.parametrize('mimetype', ['audio/pcm', 'audio/x-pcm'])
+def test_pcm_is_little_endian(mimetype):
+    samples = np.array([1000, -2000], dtype='<i2').tobytes()
+    audio = decode_audio_bytes(samples, mimetype, sample_rate=16000)
+    assert np.allclose(audio * 32768, [1000, -2000])
+
+
+@pytest.mark.parametrize('rate', [0, '0', '-8000', 'fast'])
+def test_bad_rate_is_a_value_error(rate):
+    with pytest.raises(ValueError, match='sample rate'):
+        decode_audio_bytes(b'\0\0' * 10, 'audio/pcm', sample_rate=rate)
+
+
+def test_bad_channels_is_a_value_error():
+    with pytest.raises(ValueError, match='channel count'):
+        decode_audio_bytes(b'\0\0' * 10, 'audio/pcm', {'channels': 'two'})
+
+
+def test_stereo_is_downmixed_and_odd_byte_dropped():
+    samples = np.array([100, 300, -100, -300], dtype='<i2').tobytes() + b'\x01'
+    audio = decode_audio_bytes(samples, 'audio/pcm', {'channels': '2'})
+    assert np.allclose(audio * 32768, [200, -200])
+
+
+def test_wav_roundtrip_and_resample():
+    buf = io.BytesIO()
+    with wave.open(buf, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(48000)
+        wav.writeframes(np.zeros(4800, dtype='<i2').tobytes())
+    audio = decode_wav_bytes(buf.getvalue())
+    assert audio.dtype == np.float32 and len(audio) == 1600
+
+
+def test_unknown_formats_fall_back():
+    assert decode_audio_bytes(b'ID3 not a wav') is None
+    assert resample_to_whisper(np.zeros(10, dtype=np.float32), 44100) is None
+    assert pcm_to_float32(b'\0' * 6, 3) is None
@@ -0,0 +1,76 @@
+import io
+import wave
+
+import numpy as np
+
+from batch_transcribe import iter_audio_files, split_windows, transcribe_files
+
+RATE = 16000
+
+
+def wav_bytes(seconds):
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes(np.zeros(int(seconds * RATE), dtype="<i2").tobytes())
+    return buf.getvalue()
+
+
+class BatchModel:
+    def __init__(self, fail_on=None):
+        self.batches = []
+        self.fail_on = fail_on
+
+    def transcribe_batch(self, windows, language=None):
+        self.batches.append([len(w) / RATE for w in windows])
+        if self.fail_on is not None and len(self.batches) == self.fail_on:
+            raise RuntimeError("out of memory")
+        return [f"{len(w) / RATE:g}s" for w in windows]
+
+
+def test_split_windows():
+    assert [len(w) for w in split_windows(np.zeros(75 * RATE))] == [30 * RATE, 30 * RATE, 15 * RATE]
+    assert len(split_windows(np.zeros(0))) == 1
+
+
+def test_windows_of_consecutive_files_share_passes():
+    model = BatchModel()
+    sources = [("a", wav_bytes(45)), ("b", wav_bytes(5)), ("c", wav_bytes(10))]
+    results = list(transcribe_files(sources, "en", batch_size=2, model=model))
+    assert model.batches == [[30, 15], [5, 10]]
+    assert [r["file"] for r in results] == ["a", "b", "c"]
+    assert results[0] == {"file": "a", "text": "30s 15s", "duration": 45.0, "windows": 2}
+
+
+def test_sources_are_read_lazily():
+    read = []
+
+    def sources():
+        for name in ("a", "b", "c", "d"):
+            read.append(name)
+            yield name, wav_bytes(1)
+
+    results = transcribe_files(sources(), batch_size=2, model=BatchModel())
+    assert next(results)["file"] == "a"
+    assert read == ["a", "b"]
+    assert [r["file"] for r in results] == ["b", "c", "d"]
+
+
+def test_bad_files_and_failed_passes_become_errors():
+    model = BatchModel(fail_on=1)
+    sources = [("empty", b""), ("a", wav_bytes(1)), ("b", wav_bytes(1)), ("c", wav_bytes(1))]
+    results = list(transcribe_files(sources, batch_size=2, model=model))
+    assert [r["file"] for r in results] == ["empty", "a", "b", "c"]
+    assert "empty" in results[0]["error"]
+    assert results[1]["error"] == results[2]["error"] == "transcription failed: out of memory"
+    assert results[3]["text"] == "1s"
+
+
+def test_iter_audio_files(tmp_path):
+    (tmp_path / "sub").mkdir()
+    for name in ("b.wav", "a.mp3", "notes.txt", "sub/c.flac"):
+        (tmp_path / name).write_bytes(b"")
+    assert [p[len(str(tmp_path)) + 1:] for p in iter_audio_files([str(tmp_path)])] == \
+        ["a.mp3", "b.wav", "sub/c.flac"]
@@ -0,0 +1,92 @@
+import threading
+import time
+
+from conversation_memory import ConversationMemory, estimate_tokens, ollama_summarizer
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_oldest_turns_are_evicted_to_fit_the_budget():
+    memory = ConversationMemory(budget=10)  # "User: abc" is 2 tokens
+    for word in ("one", "two", "three", "four", "five", "six"):
+        memory.add("User", word * 2)
+    assert memory.tokens <= 10
+    assert memory.lines()[-1] == "User: sixsix"
+    assert "User: oneone" not in memory.lines()  # no summarizer: dropped
+    assert memory.render() == "\n".join(memory.lines())
+
+
+def test_newest_turn_is_kept_even_over_budget():
+    memory = ConversationMemory(budget=2)
+    memory.add("User", "short")
+    memory.add("User", "a much longer line than the budget allows")
+    assert len(memory) == 1 and memory.tokens > 2
+
+
+def test_evicted_turns_stay_until_the_summary_lands():
+    release = threading.Event()
+    calls = []
+
+    def summarize(summary, turns):
+        release.wait(5)
+        calls.append((summary, [t.content for t in turns]))
+        return f"{summary} {' '.join(t.content for t in turns)}".strip()
+
+    memory = ConversationMemory(budget=estimate_tokens("User: aaaa") * 2, summarize_fn=summarize)
+    for content in ("aaaa", "bbbb", "cccc"):
+        memory.add("User", content)
+    # "aaaa" is out of the budget but not summarized yet, so it is still in the prompt
+    assert memory.lines() == ["User: aaaa", "User: bbbb", "User: cccc"]
+
+    release.set()
+    assert wait_for(lambda: memory.summary == "aaaa")
+    assert memory.lines() == ["User: bbbb", "User: cccc"]
+    assert memory.build_prompt("Assistant:") == \
+        "Summary of earlier conversation: aaaa\nUser: bbbb\nUser: cccc\nAssistant:"
+
+    memory.add("User", "dddd")
+    assert wait_for(lambda: memory.summary == "aaaa bbbb")
+    assert calls == [("", ["aaaa"]), ("aaaa", ["bbbb"])]
+
+
+def test_failed_summary_keeps_the_old_one():
+    def summarize(summary, turns):
+        raise RuntimeError("ollama down")
+
+    memory = ConversationMemory(budget=estimate_tokens("User: aaaa"), summarize_fn=summarize)
+    memory.add("User", "aaaa")
+    memory.add("User", "bbbb")
+    assert wait_for(lambda: memory.lines() == ["User: bbbb"])
+    assert memory.summary == ""
+
+
+def test_clear_discards_a_summary_in_flight():
+    release = threading.Event()
+    memory = ConversationMemory(budget=estimate_tokens("User: aaaa"),
+                                summarize_fn=lambda summary, turns: release.wait(5) and "stale")
+    memory.add("User", "aaaa")
+    memory.add("User", "bbbb")
+    memory.clear()
+    release.set()
+    assert wait_for(lambda: memory._summarizer is None)
+    assert memory.summary == "" and not memory
+
+
+def test_ollama_summarizer_prompt():
+    class Client:
+        def generate(self, prompt, options=None, timeout=None):
+            self.prompt, self.options = prompt, options
+            return {"response": "new summary"}
+
+    client = Client()
+    memory = ConversationMemory()
+    turn = memory.add("Speaker", "we ship on Friday")
+    summarize = ollama_summarizer(client, max_tokens=100)
+    assert summarize("", [turn]) == "new summary"
+    assert "(none)" in client.prompt and "Speaker: we ship on Friday" in client.prompt
+    assert "at most 75 words" in client.prompt and client.options["num_predict"] == 100
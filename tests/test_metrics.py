@@ -0,0 +1,68 @@
+import pytest
+
+from metrics import Registry, StageTimer
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    hist = registry.histogram("req_seconds", "Request time", ["stage"], buckets=(0.1, 1, 0.5))
+    for value in (0.05, 0.1, 0.3, 2):
+        hist.observe(value, stage="llm")
+    hist.observe(0.7, stage="decode")
+    lines = hist.render()
+    assert lines[:2] == ["# HELP req_seconds Request time", "# TYPE req_seconds histogram"]
+    assert lines[2:] == [
+        'req_seconds_bucket{stage="decode",le="0.1"} 0',
+        'req_seconds_bucket{stage="decode",le="0.5"} 0',
+        'req_seconds_bucket{stage="decode",le="1"} 1',
+        'req_seconds_bucket{stage="decode",le="+Inf"} 1',
+        'req_seconds_sum{stage="decode"} 0.700000',
+        'req_seconds_count{stage="decode"} 1',
+        # A value on a bound counts in that bucket (le is inclusive)
+        'req_seconds_bucket{stage="llm",le="0.1"} 2',
+        'req_seconds_bucket{stage="llm",le="0.5"} 3',
+        'req_seconds_bucket{stage="llm",le="1"} 3',
+        'req_seconds_bucket{stage="llm",le="+Inf"} 4',
+        'req_seconds_sum{stage="llm"} 2.450000',
+        'req_seconds_count{stage="llm"} 4',
+    ]
+
+
+def test_counter_and_gauge():
+    registry = Registry()
+    requests = registry.counter("requests_total", "Requests", ["status"])
+    requests.inc(status=200)
+    requests.inc(2, status=200)
+    requests.inc(status=500)
+    depth = registry.gauge("queue_depth", "Waiting")
+    depth.inc()
+    depth.dec(3)
+    assert requests.render()[2:] == ['requests_total{status="200"} 3', 'requests_total{status="500"} 1']
+    assert depth.render()[2:] == ["queue_depth -2"]
+
+    depth.set_function(lambda: 7)
+    assert depth.render()[2:] == ["queue_depth 7"]
+    depth.set_function(lambda: 1 / 0)  # a failing reader keeps the last value
+    assert depth.render()[2:] == ["queue_depth 7"]
+
+    text = registry.render()
+    assert text.endswith("\n") and "# TYPE requests_total counter" in text and "# TYPE queue_depth gauge" in text
+
+
+def test_stage_timer_feeds_the_histogram(monkeypatch):
+    registry = Registry()
+    hist = registry.histogram("stage_seconds", "Stage time", ["stage"])
+    timer = StageTimer(hist)
+    with timer.stage("decode"):
+        pass
+    timer.add("llm", 0.25)
+    timer.add("llm", 0.25)
+    assert timer.stages["llm"] == 0.5
+    timings = timer.as_dict()
+    assert timings["llm"] == 500.0 and set(timings) == {"decode", "llm", "total"}
+    assert 'stage_seconds_count{stage="llm"} 2' in hist.render()
+
+    with pytest.raises(ValueError):
+        with timer.stage("failing"):
+            raise ValueError
+    assert "failing" in timer.stages
@@ -0,0 +1,103 @@
+import threading
+
+import numpy as np
+import pytest
+
+import model_controller
+from model_controller import AdaptiveTranscriber
+
+
+class FakeModel:
+    def __init__(self, size):
+        self.size = size
+
+    def transcribe(self, audio, language=None, **options):
+        return {"text": self.size}
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    loaded = []
+
+    def get_transcriber(size, **config):
+        loaded.append(size)
+        return FakeModel(size)
+
+    monkeypatch.setattr(model_controller, "get_transcriber", get_transcriber)
+    return loaded
+
+
+def controller(initial, cooldown=0):
+    switched = threading.Event()
+    ctl = AdaptiveTranscriber(sizes=["tiny", "base", "small"], target=1.0, initial=initial,
+                              cooldown=cooldown, on_switch=lambda size: switched.set())
+    return ctl, switched
+
+
+def test_steps_down_when_over_target(loads):
+    ctl, switched = controller("base")
+    for _ in range(3):
+        ctl.record("base", 2.0, 3.0)  # 1.5 s per 2 s call
+    assert switched.wait(5)
+    assert ctl.size == "tiny" and ctl.model.size == "tiny" and ctl.switches == 1
+    assert loads == ["base", "tiny"]
+
+
+def test_steps_up_when_next_size_fits_the_margin(loads):
+    ctl, switched = controller("tiny")
+    for _ in range(3):
+        ctl.record("tiny", 2.0, 0.1)  # base predicted at 1.9 * 0.1 s = 0.19 s
+    assert switched.wait(5)
+    assert ctl.size == "base"
+
+
+def test_holds_inside_the_hysteresis_band(loads):
+    ctl, _ = controller("tiny")
+    # tiny: 0.42 s (under target); base predicted 0.8 s (over 0.7 * target)
+    for _ in range(5):
+        ctl.record("tiny", 2.0, 0.42)
+    assert ctl.size == "tiny" and ctl.switches == 0 and not ctl._switching
+    assert ctl.stats()["predicted_seconds"]["base"] == pytest.approx(0.798)
+
+
+def test_cooldown_blocks_moving_up(loads):
+    ctl, _ = controller("tiny", cooldown=60)
+    for _ in range(5):
+        ctl.record("tiny", 2.0, 0.1)
+    assert ctl.size == "tiny" and not ctl._switching
+
+
+def test_needs_min_samples_before_switching(loads):
+    ctl, _ = controller("base")
+    for _ in range(model_controller.MIN_SAMPLES - 1):
+        ctl.record("base", 2.0, 5.0)
+    assert not ctl._switching and ctl.size == "base"
+
+
+def test_failed_load_keeps_the_current_model(monkeypatch):
+    def get_transcriber(size, **config):
+        if size != "base":
+            raise RuntimeError("no weights")
+        return FakeModel(size)
+
+    monkeypatch.setattr(model_controller, "get_transcriber", get_transcriber)
+    ctl, switched = controller("base")
+    for _ in range(3):
+        ctl.record("base", 2.0, 3.0)
+    for thread in threading.enumerate():
+        if thread.name == "whisper-switch":
+            thread.join(5)
+    assert ctl.size == "base" and not switched.is_set() and not ctl._switching
+
+
+def test_transcribe_times_array_input(loads):
+    ctl, _ = controller("base")
+    assert ctl.transcribe(np.zeros(32000, dtype=np.float32))["text"] == "base"
+    assert ctl.transcribe("speech.wav")["text"] == "base"  # paths aren't timed
+    assert len(ctl._speed["base"]) == 1
+    assert ctl._speed["base"][0][0] == 2.0
+
+
+def test_initial_size_must_be_listed(loads):
+    with pytest.raises(ValueError):
+        AdaptiveTranscriber(sizes=["tiny"], initial="large")
@@ -0,0 +1,151 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+httpx = pytest.importorskip("httpx")
+
+from benchmark import StubOllama
+from ollama_client import AsyncOllamaClient, GenerateSession, ModelKeeper, OllamaClient
+
+
+@pytest.fixture
+def stub():
+    server = StubOllama(tokens=5, tokens_per_second=1000, prompt_ms=0).start()
+    yield server
+    server.stop()
+
+
+def test_sync_generate_and_stream(stub):
+    client = OllamaClient(host=stub.url, model=stub.model)
+    assert client.generate("hi")["response"] == "".join(f" token{i}" for i in range(5))
+    assert list(client.stream_text("hi")) == [f" token{i}" for i in range(5)]
+    client.close()
+
+
+def test_async_generate_stream_and_tags(stub):
+    async def run():
+        client = AsyncOllamaClient(host=stub.url, model=stub.model)
+        try:
+            result = await client.generate("hi")
+            pieces = [piece async for piece in client.stream_text("hi")]
+            models = await client.tags()
+        finally:
+            await client.aclose()
+        return result, pieces, models
+
+    result, pieces, models = asyncio.run(run())
+    assert result["response"] == "".join(pieces)
+    assert pieces == [f" token{i}" for i in range(5)]
+    assert [m["name"] for m in models] == [stub.model]
+    assert stub.requests == 2
+
+
+def test_payload_is_shared(stub):
+    client = AsyncOllamaClient(host=stub.url, model="m")
+    payload = client._payload("p", None, True, {"temperature": 0}, {"context": [1]})
+    assert payload["model"] == "m" and payload["stream"] is True
+    assert payload["options"] == {"temperature": 0} and payload["context"] == [1]
+    asyncio.run(client.aclose())
+
+
+class LoadingClient:
+    """Stands in for OllamaClient in ModelKeeper; each load waits for ``release``."""
+    model = "fake"
+
+    def __init__(self, error=None):
+        self.error = error
+        self.release = threading.Event()
+
+    def generate(self, prompt, keep_alive=None, timeout=None):
+        self.release.wait(5)
+        if self.error:
+            raise self.error
+
+
+def test_keeper_waits_while_the_model_loads():
+    client = LoadingClient()
+    keeper = ModelKeeper(client, interval=60, load_timeout=5).start()
+    assert keeper.wait_ready(timeout=0.05) is False  # still loading
+    threading.Timer(0.05, client.release.set).start()
+    assert keeper.wait_ready() is True
+    assert keeper.last_error is None and keeper.load_seconds is not None
+    keeper.stop()
+
+
+def test_keeper_does_not_wait_after_a_failed_load():
+    client = LoadingClient(ConnectionError("connection refused"))
+    keeper = ModelKeeper(client, interval=60, load_timeout=300).start()
+    client.release.set()
+    assert keeper.wait_ready(timeout=5) is False
+    start = time.monotonic()
+    assert keeper.wait_ready() is False
+    assert time.monotonic() - start < 1
+    assert isinstance(keeper.last_error, ConnectionError)
+    keeper.stop()
+
+
+def test_keeper_against_stub(stub):
+    keeper = ModelKeeper(OllamaClient(host=stub.url, model=stub.model), interval=60).start()
+    assert keeper.wait_ready(timeout=5) is True
+    keeper.stop()
+
+
+class SessionClient:
+    """Replies "ok" with a context one token longer per call; can fail requests that send one."""
+
+    def __init__(self, context_size=3, fail_with_context=False):
+        self.context_size = context_size
+        self.fail_with_context = fail_with_context
+        self.sent = []
+
+    def stream_generate(self, prompt, options=None, keep_alive=None, **extra):
+        self.sent.append((prompt, extra.get("context")))
+        if self.fail_with_context and "context" in extra:
+            raise RuntimeError("model was reloaded")
+        yield {"response": "ok", "done": False}
+        yield {"response": "", "done": True, "context": list(range(self.context_size)),
+               "prompt_eval_count": len(prompt), "eval_count": 1}
+
+
+def test_session_reuses_context_between_turns():
+    client = SessionClient()
+    session = GenerateSession(client, max_context=10)
+    assert list(session.stream_text("turn 1", "full 1")) == ["ok"]
+    assert list(session.stream_text("turn 2", lambda: "full 2")) == ["ok"]
+    assert client.sent == [("full 1", None), ("turn 2", [0, 1, 2])]
+    assert session.last_stats["prompt_eval_count"] == len("turn 2")
+
+
+def test_session_drops_context_over_max():
+    client = SessionClient(context_size=20)
+    session = GenerateSession(client, max_context=10)
+    list(session.stream_text("turn 1", "full 1"))
+    assert session.context is None
+    list(session.stream_text("turn 2", lambda: "full 2"))
+    assert client.sent[-1] == ("full 2", None)
+
+
+def test_session_falls_back_to_full_prompt_when_context_fails():
+    client = SessionClient()
+    session = GenerateSession(client, max_context=10)
+    list(session.stream_text("turn 1", "full 1"))
+    client.fail_with_context = True
+    built = []
+    assert list(session.stream_text("turn 2", lambda: built.append(1) or "full 2")) == ["ok"]
+    assert client.sent[-2:] == [("turn 2", [0, 1, 2]), ("full 2", None)]
+    assert built == [1]  # the full prompt is only built for the retry
+
+
+def test_session_error_without_context_propagates():
+    class Broken:
+        def stream_generate(self, prompt, **kwargs):
+            raise RuntimeError("ollama down")
+            yield
+
+    session = GenerateSession(Broken())
+    with pytest.raises(RuntimeError, match="ollama down"):
+        list(session.stream_text("turn", "full"))
+    assert session.context is None
@@ -0,0 +1,97 @@
+import threading
+import time
+
+import numpy as np
+
+from pipeline import (BLOCK, COALESCE, DROP_NEWEST, DROP_OLDEST, AudioChunk, BoundedQueue, Worker,
+                      merge_audio_chunks)
+
+
+def chunk(utterance_id, *samples, final=False):
+    return AudioChunk(utterance_id, np.array(samples, dtype=np.int16), final)
+
+
+def test_drop_oldest_evicts_and_reports():
+    dropped = []
+    q = BoundedQueue(2, DROP_OLDEST, on_drop=dropped.append)
+    assert all(q.put(i) for i in range(4))
+    assert q.items() == [2, 3]
+    assert dropped == [0, 1] and q.dropped == 2
+
+
+def test_drop_newest_refuses_and_reports():
+    dropped = []
+    q = BoundedQueue(2, DROP_NEWEST, on_drop=dropped.append)
+    assert [q.put(i) for i in range(4)] == [True, True, False, False]
+    assert q.items() == [0, 1]
+    assert dropped == [2, 3] and q.dropped == 2
+
+
+def test_block_times_out_then_waits_for_room():
+    q = BoundedQueue(1, BLOCK)
+    q.put("a")
+    assert q.put("b", timeout=0.01) is False
+
+    threading.Timer(0.05, q.get).start()
+    assert q.put("b", timeout=5) is True
+    assert q.items() == ["b"] and q.dropped == 0
+
+
+def test_close_wakes_a_blocked_put():
+    q = BoundedQueue(1, BLOCK)
+    q.put("a")
+    threading.Timer(0.05, q.close).start()
+    assert q.put("b", timeout=5) is False
+
+
+def test_coalesce_merges_chunks_of_an_open_utterance():
+    q = BoundedQueue(2, COALESCE, coalesce=merge_audio_chunks)
+    q.put(chunk(1, 1, 2))
+    q.put(chunk(1, 3))
+    q.put(chunk(1, 4, final=True))
+    q.put(chunk(1, 5))  # the utterance was closed, so this is new work
+    items = q.items()
+    assert len(items) == 2 and q.coalesced == 2
+    assert list(items[0].audio) == [1, 2, 3, 4] and items[0].final
+    assert list(items[1].audio) == [5]
+
+
+def test_coalesce_drops_oldest_when_nothing_merges():
+    dropped = []
+    q = BoundedQueue(2, COALESCE, coalesce=merge_audio_chunks, on_drop=dropped.append)
+    for utterance_id in range(3):
+        q.put(chunk(utterance_id, utterance_id, final=True))
+    assert [c.utterance_id for c in q.items()] == [1, 2]
+    assert [c.utterance_id for c in dropped] == [0]
+
+
+def test_get_drains_then_returns_none_after_close():
+    q = BoundedQueue(4)
+    q.put(1)
+    q.close()
+    assert q.put(2) is False
+    assert q.get() == 1
+    assert q.get() is None
+    assert BoundedQueue(1).get(timeout=0.01) is None
+
+
+def test_worker_survives_failures_and_stops_on_close():
+    seen = []
+
+    def handler(item):
+        if item == "bad":
+            raise RuntimeError("boom")
+        seen.append(item)
+
+    q = BoundedQueue(8)
+    worker = Worker("test-worker", q, handler)
+    worker.start()
+    for item in ("a", "bad", "b"):
+        q.put(item)
+    deadline = time.time() + 5
+    while worker.processed < 3 and time.time() < deadline:
+        time.sleep(0.01)
+    worker.stop()
+    worker.join(5)
+    assert not worker.is_alive()
+    assert seen == ["a", "b"] and worker.processed == 3
@@ -0,0 +1,100 @@
+import sqlite3
+import time
+
+from response_cache import ResponseCache, answer_key, audio_key, normalize_text
+
+
+def rows(path, table="responses"):
+    with sqlite3.connect(path) as db:
+        return [r[0] for r in db.execute(f"SELECT key FROM {table} ORDER BY rowid")]
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2, ttl=0, path="")
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the oldest
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["hits"] == 3 and cache.stats()["misses"] == 1
+
+
+def test_ttl_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = ResponseCache(max_entries=4, ttl=10, path="")
+    cache.put("k", "v")
+    now[0] += 9
+    assert cache.get("k") == "v"
+    now[0] += 2
+    assert cache.get("k", "gone") == "gone"
+    assert len(cache) == 0
+
+
+def test_disabled_cache_stores_nothing():
+    cache = ResponseCache(max_entries=0, path="")
+    cache.put("k", "v")
+    assert cache.get("k") is None and not cache.enabled
+
+
+def test_answer_key_ignores_trivial_differences():
+    assert normalize_text("  What's   the TIME?! ") == "what's the time"
+    key = answer_key("What's the time?", "template", "gemma")
+    assert key == answer_key("what's the time", "template", "gemma")
+    assert key != answer_key("what's the time", "template", "gemma", {"temperature": 0})
+    assert key != answer_key("what's the date", "template", "gemma")
+
+
+
+def test_audio_key_covers_language_model_and_layout():
+    key = audio_key("raw", b"abc", "en", "openai/base")
+    assert key == audio_key("raw", b"abc", "en", "openai/base")
+    assert key != audio_key("pcm", b"abc", "en", "openai/base")
+    assert key != audio_key("raw", b"abd", "en", "openai/base")
+    assert key != audio_key("raw", b"abc", None, "openai/base")
+    assert key != audio_key("raw", b"abc", "en", "faster/base")
+    assert audio_key("raw", b"abc", "en", "openai/base", ["audio/l16", "8000", None, None]) != \
+        audio_key("raw", b"abc", "en", "openai/base", ["audio/l16", "16000", None, None])
+
+
+def test_disk_tier_keeps_most_recent_rows(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResponseCache(max_entries=2, ttl=0, path=path, disk_entries=3)
+    for i in range(5):
+        cache.put(f"k{i}", i)
+    assert rows(path) == ["k2", "k3", "k4"]
+
+    # Rewriting a key makes it the newest row
+    cache.put("k2", 22)
+    cache.put("k5", 5)
+    assert rows(path) == ["k4", "k2", "k5"]
+
+
+def test_disk_tier_uncapped(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResponseCache(max_entries=2, ttl=0, path=path, disk_entries=0)
+    for i in range(5):
+        cache.put(f"k{i}", i)
+    assert len(rows(path)) == 5
+
+
+def test_expired_disk_row_is_deleted_on_lookup(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResponseCache(max_entries=1, ttl=60, path=path)
+    cache.put("old", "answer")
+    cache.put("new", "answer")  # pushes "old" out of memory
+    cache._db.execute("UPDATE responses SET expires = ? WHERE key = 'old'", (time.time() - 1,))
+    cache._db.commit()
+
+    assert cache.get("old") is None
+    assert rows(path) == ["new"]
+    assert cache.stats()["misses"] == 1
+
+
+def test_disk_hit_survives_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    ResponseCache(max_entries=4, ttl=60, path=path).put("k", {"text": "hi"})
+    cache = ResponseCache(max_entries=4, ttl=60, path=path)
+    assert cache.get("k") == {"text": "hi"}
+    assert cache.stats()["disk_hits"] == 1
@@ -0,0 +1,86 @@
+import threading
+
+import numpy as np
+
+from ring_buffer import AudioRingBuffer
+
+
+def ring(capacity=10):
+    return AudioRingBuffer(seconds=1, sample_rate=capacity)
+
+
+def test_wraparound_keeps_newest_samples_contiguous():
+    buf = ring()
+    buf.write(np.arange(7))
+    buf.write(np.arange(7, 13))
+    assert list(buf.latest()) == list(range(3, 13))
+    assert list(buf.latest(4)) == [9, 10, 11, 12]
+    assert buf.total_written == 13
+    assert buf.dropped == 3
+    assert len(buf) == 10
+
+
+def test_oversized_write_keeps_its_tail():
+    buf = ring()
+    buf.write(np.arange(25))
+    assert list(buf.latest()) == list(range(15, 25))
+    assert buf.total_written == 25
+    assert buf.dropped == 15
+
+
+def test_views_are_not_copies():
+    buf = ring()
+    buf.write(np.arange(13))
+    assert np.shares_memory(buf.latest(4), buf._data)
+    view, _ = buf.since(10)
+    assert np.shares_memory(view, buf._data)
+
+
+def test_view_valid_until_capacity_minus_n_more_samples():
+    buf = ring()
+    buf.write(np.arange(13))
+    view = buf.latest(4)
+    for value in range(100, 106):  # capacity - n = 6 more samples
+        buf.write([value])
+    assert list(view) == [9, 10, 11, 12]
+    buf.write([106])
+    assert list(view) != [9, 10, 11, 12]
+
+
+def test_since_and_span_use_the_absolute_clock():
+    buf = ring()
+    buf.write(np.arange(13))
+    view, position = buf.since(11)
+    assert list(view) == [11, 12] and position == 13
+    view, _ = buf.since(0)  # overwritten audio is skipped
+    assert list(view) == list(range(3, 13))
+    assert list(buf.span(5, 8)) == [5, 6, 7]
+    assert list(buf.span(0, 5)) == [3, 4]
+    assert len(buf.span(12, 20)) == 1
+    assert len(buf.span(20, 30)) == 0
+
+
+def test_discard_keep_last_and_clear():
+    buf = ring()
+    buf.write(np.arange(8))
+    buf.discard_until(5)
+    assert list(buf.latest()) == [5, 6, 7]
+    view, _ = buf.since(0)
+    assert list(view) == [5, 6, 7]
+    buf.write([8, 9])
+    buf.keep_last(0.2)  # 2 samples at 10 Hz
+    assert list(buf.latest()) == [8, 9]
+    buf.clear()
+    assert len(buf) == 0 and buf.duration == 0
+    assert buf.total_written == 10
+
+
+def test_wait_for_data_wakes_on_write_and_wake():
+    buf = ring()
+    assert buf.wait_for_data(0, timeout=0.01) is False
+
+    threading.Timer(0.05, buf.write, args=([1, 2],)).start()
+    assert buf.wait_for_data(0, timeout=5) is True
+
+    threading.Timer(0.05, buf.wake).start()
+    assert buf.wait_for_data(2, timeout=5) is False
@@ -0,0 +1,82 @@
+import threading
+
+from speculative import Speculator, similarity
+
+QUESTION = "what is the capital of france"
+
+
+class Generator:
+    """Blocks until released (or cancelled) and answers with the text it was given."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.cancelled = []
+
+    def __call__(self, text, cancelled):
+        while not self.release.wait(0.01):
+            if cancelled.is_set():
+                self.cancelled.append(text)
+                return None
+        return f"answer to {text}"
+
+
+def test_similarity_ignores_case_and_punctuation():
+    assert similarity("What is the capital of France?", QUESTION) == 1.0
+    assert similarity(QUESTION, "play some music please") < 0.5
+
+
+def test_hit_reuses_the_running_job():
+    gen = Generator()
+    spec = Speculator(gen)
+    spec.speculate(QUESTION)
+    spec.speculate(QUESTION + " today")  # close enough; keeps the job
+    assert spec.started == 1
+
+    done = threading.Event()
+    results = []
+    assert spec.finalize("What is the capital of France?", lambda job: (results.append(job.result), done.set()))
+    gen.release.set()
+    assert done.wait(5)
+    assert results == [f"answer to {QUESTION}"]
+    assert spec.hits == 1 and spec.misses == 0
+
+
+def test_callback_runs_when_job_already_finished():
+    gen = Generator()
+    gen.release.set()
+    spec = Speculator(gen)
+    spec.speculate(QUESTION)
+    spec._job.join(5)
+    results = []
+    assert spec.finalize(QUESTION, lambda job: results.append(job.result))
+    assert results == [f"answer to {QUESTION}"]
+
+
+def test_miss_cancels_the_job():
+    gen = Generator()
+    spec = Speculator(gen)
+    spec.speculate(QUESTION)
+    job = spec._job
+    assert spec.finalize("how tall is the eiffel tower", lambda job: None) is False
+    job.join(5)
+    assert gen.cancelled == [QUESTION]
+    assert spec.misses == 1 and spec.hits == 0
+
+
+def test_diverging_partial_restarts():
+    gen = Generator()
+    spec = Speculator(gen)
+    spec.speculate(QUESTION)
+    first = spec._job
+    spec.speculate("how tall is the eiffel tower")
+    first.join(5)
+    assert spec.started == 2 and gen.cancelled == [QUESTION]
+    spec.cancel()
+    assert spec._job is None
+
+
+def test_short_fragments_are_ignored():
+    spec = Speculator(Generator())
+    spec.speculate("what is")
+    assert spec.started == 0
+    assert spec.finalize("what is", lambda job: None) is False
@@ -0,0 +1,95 @@
+import numpy as np
+
+from streaming_transcriber import StreamingTranscriber, Word, words_from_result
+
+RATE = 100  # samples per second; keeps the fake audio tiny
+
+
+def words(*specs):
+    return [Word(start, end, text) for start, end, text in specs]
+
+
+class ScriptedDecoder:
+    """Returns the next scripted hypothesis on every decode."""
+
+    def __init__(self, *hypotheses):
+        self.hypotheses = list(hypotheses)
+        self.calls = []
+
+    def __call__(self, audio, prompt):
+        self.calls.append((len(audio), prompt))
+        return self.hypotheses.pop(0)
+
+
+def second():
+    return np.zeros(RATE, dtype=np.float32)
+
+
+def test_words_commit_once_two_hypotheses_agree():
+    decoder = ScriptedDecoder(
+        words((0.0, 0.5, " hello"), (0.5, 1.0, " word")),
+        words((0.0, 0.5, " hello"), (0.5, 1.0, " world"), (1.0, 1.5, " how")),
+        words((0.0, 0.5, " Hello,"), (0.5, 1.0, " world"), (1.0, 1.5, " how"), (1.5, 2.0, " are")),
+    )
+    st = StreamingTranscriber(decoder, sample_rate=RATE)
+    assert st.insert_audio(second()[:50]) is None  # less than a step
+
+    event = st.insert_audio(second())
+    assert (event.kind, event.committed, event.tentative) == ("partial", "", "hello word")
+    event = st.insert_audio(second())
+    assert (event.committed, event.tentative) == ("hello", "world how")
+    event = st.insert_audio(second())
+    assert (event.committed, event.tentative) == ("hello world how", "are")
+
+    # The committed text is the prompt for the next pass
+    assert [prompt for _, prompt in decoder.calls] == [None, None, "hello"]
+    final = st.finish()  # nothing new to decode
+    assert (final.kind, final.text, final.tentative) == ("final", "hello world how are", "")
+    assert st.decode_passes == 0 and st.committed == []
+
+
+def test_finish_decodes_remaining_audio():
+    decoder = ScriptedDecoder(words((0.0, 0.5, " one")), words((0.0, 0.5, " one"), (0.5, 1.2, " two")))
+    events = []
+    st = StreamingTranscriber(decoder, sample_rate=RATE, on_event=events.append)
+    st.insert_audio(second())
+    st.insert_audio(second()[:50])
+    assert st.finish().text == "one two"
+    assert [e.kind for e in events] == ["partial", "final"]
+
+
+def test_committed_audio_is_trimmed():
+    decoder = ScriptedDecoder(
+        words((0.0, 0.5, " a"), (0.5, 1.0, " b")),
+        words((0.0, 0.5, " a"), (0.5, 1.0, " b"), (1.5, 2.0, " c")),
+        words((0.5, 1.0, " c")),  # relative to the trimmed window
+    )
+    st = StreamingTranscriber(decoder, sample_rate=RATE, trim_s=2)
+    st.insert_audio(second())
+    event = st.insert_audio(second())
+    assert event.committed == "a b"
+    st.insert_audio(second())
+    # The window dropped the first second (committed up to b's end)
+    assert [n for n, _ in decoder.calls] == [100, 200, 200]
+    assert st.committed[-1] == Word(1.5, 2.0, " c")
+
+
+def test_window_is_force_committed_when_nothing_agrees():
+    decoder = ScriptedDecoder(
+        words((0.0, 0.5, " x")),
+        words((0.0, 0.5, " y"), (1.0, 1.5, " z")),
+        words((0.2, 0.4, " w")),
+    )
+    st = StreamingTranscriber(decoder, sample_rate=RATE, max_window_s=2)
+    st.insert_audio(second())
+    event = st.insert_audio(second())
+    assert (event.committed, event.tentative) == ("y z", "")
+    st.insert_audio(second())
+    assert [n for n, _ in decoder.calls] == [100, 200, 150]
+
+
+def test_words_from_result():
+    result = {"segments": [{"words": [{"start": 0.0, "end": 0.4, "word": " hi"}]},
+                           {"words": [{"start": 0.5, "end": 0.9, "word": " there"}]}]}
+    assert words_from_result(result) == words((0.0, 0.4, " hi"), (0.5, 0.9, " there"))
+    assert words_from_result({"text": ""}) == []
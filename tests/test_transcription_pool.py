@@ -0,0 +1,72 @@
+import time
+
+import numpy as np
+import pytest
+
+import transcriber
+import transcription_pool
+from transcription_pool import PoolBusyError, TranscriptionPool
+
+
+class FakeModel:
+    def transcribe(self, audio, language=None, **options):
+        if isinstance(audio, np.ndarray) and len(audio) == 0:
+            raise ValueError("no audio")
+        if isinstance(audio, np.ndarray) and len(audio) == 1:
+            time.sleep(1)
+        return {"text": f"{len(audio)} {language}"}
+
+    def transcribe_batch(self, windows, language=None, **options):
+        return [f"batch {len(w)}" for w in windows]
+
+    def warm_up(self):
+        pass
+
+
+def fake_worker_main(conn, config):
+    """Runs in the worker process: the real worker loop around a fake model."""
+    transcriber.get_transcriber = lambda **config: FakeModel()
+    transcription_pool._worker_main(conn, config)
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(transcription_pool, "_worker_main", fake_worker_main)
+    pool = TranscriptionPool(1, queue_timeout=0.2, timeout=10, health_interval=60)
+    yield pool
+    pool.close()
+
+
+def test_transcribe_and_batch_run_in_the_worker(pool):
+    assert pool.transcribe(np.zeros(5, dtype=np.float32), language="en") == {"text": "5 en"}
+    assert pool.transcribe_batch([np.zeros(2), np.zeros(3)]) == ["batch 2", "batch 3"]
+    stats = pool.stats()
+    assert stats[0]["alive"] and stats[0]["ready"] and not stats[0]["busy"]
+
+
+def test_worker_errors_are_raised(pool):
+    with pytest.raises(RuntimeError, match="no audio"):
+        pool.transcribe(np.zeros(0, dtype=np.float32))
+    assert pool.transcribe(np.zeros(1, dtype=np.float32), language="hi")["text"] == "1 hi"
+
+
+def test_busy_pool_refuses_after_the_queue_timeout(pool):
+    import threading
+
+    pool.transcribe(np.zeros(2, dtype=np.float32))  # worker is up
+    slow = threading.Thread(target=pool.transcribe, args=(np.zeros(1, dtype=np.float32),))
+    slow.start()
+    time.sleep(0.2)
+    assert pool.busy == 1
+    with pytest.raises(PoolBusyError):
+        pool.transcribe(np.zeros(2, dtype=np.float32))
+    slow.join(10)
+    assert pool.busy == 0 and pool.waiting == 0
+
+
+def test_dead_worker_is_restarted(pool):
+    pool.transcribe(np.zeros(2, dtype=np.float32))
+    pool._workers[0].process.kill()
+    pool._workers[0].process.join(5)
+    assert pool.transcribe(np.zeros(3, dtype=np.float32))["text"] == "3 None"
+    assert pool.stats()[0]["restarts"] == 1
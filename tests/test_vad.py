@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+
+from vad import EnergyZcrVad, Endpointer, create_vad
+
+RATE = 16000
+FRAME = 480  # 30 ms
+
+
+def tone(seconds, amplitude=0.3, hz=220):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (amplitude * 32767 * np.sin(2 * np.pi * hz * t)).astype(np.int16)
+
+
+def frames(samples):
+    return [samples[i:i + FRAME] for i in range(0, len(samples) - FRAME + 1, FRAME)]
+
+
+def test_energy_vad_labels_tone_and_silence():
+    vad = EnergyZcrVad(RATE)
+    assert vad.frame_samples == FRAME
+    assert not any(vad.is_speech(f) for f in frames(np.zeros(RATE, np.int16)))
+    assert all(vad.is_speech(f) for f in frames(tone(1)))
+
+
+def test_energy_vad_rejects_loud_broadband_noise():
+    noise = np.random.default_rng(0).normal(0, 0.3 * 32767, RATE).clip(-32768, 32767).astype(np.int16)
+    vad = EnergyZcrVad(RATE)
+    assert not any(vad.is_speech(f) for f in frames(noise))
+
+
+def test_create_vad():
+    assert isinstance(create_vad("energy", RATE), EnergyZcrVad)
+    with pytest.raises(ValueError, match="Unknown VAD backend"):
+        create_vad("magic", RATE)
+
+
+def test_missing_backend_falls_back_to_energy():
+    try:
+        import webrtcvad  # noqa: F401
+    except ImportError:
+        assert isinstance(create_vad("webrtc", RATE), EnergyZcrVad)
+    else:
+        pytest.skip("webrtcvad is installed")
+
+
+class LabelVad:
+    """Calls any frame with a non-zero sample speech."""
+    sample_rate = RATE
+    frame_samples = FRAME
+
+    def is_speech(self, frame):
+        return bool(np.any(frame))
+
+
+def audio(*runs):
+    """``(speech, frames)`` pairs -> int16 audio."""
+    return np.concatenate([np.full(frames * FRAME, 1000 if speech else 0, dtype=np.int16)
+                           for speech, frames in runs])
+
+
+def feed(endpointer, samples, chunk=None):
+    chunk = chunk or len(samples)
+    segments = []
+    for start in range(0, len(samples), chunk):
+        piece = samples[start:start + chunk]
+        segments += endpointer.update(piece, start + len(piece))
+    return segments
+
+
+def test_utterance_closes_after_hangover():
+    # Defaults: 60 ms onset, 600 ms (20 frame) hangover, 150 ms padding
+    samples = audio((False, 30), (True, 30), (False, 40))
+    segments = feed(Endpointer(LabelVad()), samples)
+    assert [(s.start_sample, s.end_sample) for s in segments] == [(30 * FRAME - 2400, 60 * FRAME + 2400)]
+
+
+def test_short_pause_does_not_split():
+    samples = audio((True, 20), (False, 10), (True, 20), (False, 30))
+    assert len(feed(Endpointer(LabelVad()), samples)) == 1
+
+
+def test_endpoint_waits_for_the_hangover():
+    endpointer = Endpointer(LabelVad())
+    assert endpointer.update(audio((True, 20), (False, 19)), 39 * FRAME) == []
+    assert endpointer.in_speech
+    assert len(endpointer.update(audio((False, 1)), 40 * FRAME)) == 1
+    assert not endpointer.in_speech
+
+
+def test_short_bursts_are_ignored():
+    samples = audio((False, 10), (True, 3), (False, 30))
+    assert feed(Endpointer(LabelVad()), samples) == []
+
+
+def test_chunked_input_matches_one_shot():
+    samples = audio((False, 10), (True, 25), (False, 25), (True, 40), (False, 30))
+    whole = feed(Endpointer(LabelVad()), samples)
+    chunked = feed(Endpointer(LabelVad()), samples, chunk=1000)
+    assert len(whole) == 2
+    assert chunked == whole
+
+
+def test_long_speech_is_cut_at_max_utterance():
+    samples = audio((True, 80), (False, 30))  # 2.4 s of speech
+    segments = feed(Endpointer(LabelVad(), max_utterance_s=1), samples)
+    assert len(segments) == 3
+    # Cuts land on the first frame boundary past 1 s
+    assert all(1.0 <= s.duration < 1.0 + FRAME / RATE for s in segments[:2])
+    assert segments[-1].end_sample == 80 * FRAME + 2400  # closed by the hangover
+    for a, b in zip(segments, segments[1:]):
+        assert a.end_sample == b.start_sample
+
+
+def test_dropped_audio_closes_the_open_utterance():
+    endpointer = Endpointer(LabelVad())
+    assert endpointer.update(audio((True, 20)), 20 * FRAME) == []
+    segments = endpointer.update(audio((False, 5)), 100 * FRAME)  # clock jumped
+    assert len(segments) == 1
+    assert segments[0].end_sample == 20 * FRAME + 2400
+
+
+def test_endpointer_with_the_energy_vad():
+    samples = np.concatenate((np.zeros(RATE, np.int16), tone(1), np.zeros(RATE, np.int16)))
+    segments = feed(Endpointer(create_vad("energy", RATE)), samples, chunk=1600)
+    assert len(segments) == 1
+    assert abs(segments[0].start - 1.0) < 0.2
+    assert abs(segments[0].end - 2.0) < 0.2
@@ -0,0 +1,162 @@
+import os
+import threading
+
+import numpy as np
+
+from whisper_models import registry
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+# "openai" = openai-whisper (PyTorch), "faster" = faster-whisper (CTranslate2)
+WHISPER_BACKEND = os.environ.get("WHISPER_BACKEND", "openai")
+WHISPER_MODEL_SIZE = os.environ.get("WHISPER_MODEL_SIZE", "base")
+WHISPER_DEVICE = os.environ.get("WHISPER_DEVICE", "cpu")
+# faster-whisper: int8, int8_float16, float16, float32 ...; openai: float16 or float32
+WHISPER_COMPUTE_TYPE = os.environ.get("WHISPER_COMPUTE_TYPE", "")
+WHISPER_THREADS = int(os.environ.get("WHISPER_THREADS", "0"))  # 0 = library default
+
+# transcribe() options faster-whisper accepts; others (fp16, ...) are dropped
+_FASTER_OPTIONS = ("temperature", "no_speech_threshold", "condition_on_previous_text",
+                   "compression_ratio_threshold", "log_prob_threshold", "beam_size",
+                   "best_of", "patience", "vad_filter")
+
+
+class Transcriber:
+    """Common interface over the Whisper backends.
+
+    ``transcribe`` accepts a float32 16 kHz array or a file path and returns an
+    openai-whisper shaped dict: ``text``, ``language`` and ``segments`` (each
+    with ``start``, ``end``, ``text`` and, when requested, ``words``).
+    """
+
+    backend = None
+
+    def __init__(self, size, device, compute_type, threads):
+        self.size = size
+        self.device = device
+        self.compute_type = compute_type
+        self.threads = threads
+
+    def transcribe(self, audio, language=None, initial_prompt=None, word_timestamps=False, **options):
+        raise NotImplementedError
+
+    def transcribe_batch(self, windows, language=None, **options):
+        """Transcribe a list of audio windows (<= 30 s each); returns one text per window.
+
+        The default decodes them one after another; backends override it to
+        run the windows through the encoder together.
+        """
+        return [self.transcribe(w, language=language, **options)["text"] for w in windows]
+
+    def warm_up(self):
+        """Run one pass over a second of silence so the first real request isn't slow."""
+        try:
+            self.transcribe(np.zeros(16000, dtype=np.float32), language="en")
+        except Exception as e:
+            print(f"⚠️ Whisper warm-up pass failed: {e}")
+
+    def __repr__(self):
+        return f"<{self.backend} whisper {self.size} on {self.device} ({self.compute_type})>"
+
+
+class OpenAIWhisperTranscriber(Transcriber):
+    backend = "openai"
+
+    def __init__(self, size, device="cpu", compute_type="", threads=0):
+        super().__init__(size, device, compute_type or ("float32" if device == "cpu" else "float16"), threads)
+        import whisper
+
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+        self.model = whisper.load_model(size, device=device)
+
+    @property
+    def fp16(self):
+        return self.compute_type == "float16"
+
+    def transcribe(self, audio, language=None, initial_prompt=None, word_timestamps=False, **options):
+        options.setdefault("fp16", self.fp16)
+        return self.model.transcribe(audio, language=language, initial_prompt=initial_prompt,
+                                     word_timestamps=word_timestamps, **options)
+
+    def transcribe_batch(self, windows, language=None, **options):
+        import torch
+        import whisper
+
+        # One padded 30 s log-mel per window, stacked into a single batch so
+        # the encoder and decoder each run once for all of them
+        mels = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(np.asarray(w, dtype=np.float32)),
+                                        n_mels=self.model.dims.n_mels, device=self.model.device)
+            for w in windows])
+        decode_options = whisper.DecodingOptions(language=language, fp16=self.fp16,
+                                                 without_timestamps=True)
+        return [r.text for r in whisper.decode(self.model, mels, decode_options)]
+
+
+class FasterWhisperTranscriber(Transcriber):
+    """CTranslate2 backend (``pip install faster-whisper``); int8 on CPU by default."""
+
+    backend = "faster"
+
+    def __init__(self, size, device="cpu", compute_type="", threads=0):
+        from faster_whisper import WhisperModel
+
+        compute_type = compute_type or ("int8" if device == "cpu" else "float16")
+        super().__init__(size, device, compute_type, threads)
+        self.model = WhisperModel(size, device=device, compute_type=compute_type, cpu_threads=threads)
+
+    def transcribe(self, audio, language=None, initial_prompt=None, word_timestamps=False, **options):
+        kwargs = {k: v for k, v in options.items() if k in _FASTER_OPTIONS}
+        kwargs.setdefault("beam_size", 5)
+        segments, info = self.model.transcribe(audio, language=language, initial_prompt=initial_prompt,
+                                               word_timestamps=word_timestamps, **kwargs)
+        result_segments = []
+        for segment in segments:  # a lazy generator; decoding happens here
+            item = {"start": segment.start, "end": segment.end, "text": segment.text}
+            if word_timestamps:
+                item["words"] = [{"start": w.start, "end": w.end, "word": w.word,
+                                  "probability": w.probability} for w in segment.words or []]
+            result_segments.append(item)
+        return {
+            "text": "".join(s["text"] for s in result_segments),
+            "segments": result_segments,
+            "language": info.language,
+        }
+
+
+BACKENDS = {
+    "openai": OpenAIWhisperTranscriber,
+    "faster": FasterWhisperTranscriber,
+}
+
+
+def get_transcriber(size=None, backend=None, device=None, compute_type=None, threads=None):
+    """Return the shared transcriber for this configuration, loading it on first use.
+
+    Unset arguments come from the ``WHISPER_*`` environment variables.
+    """
+    size = size or WHISPER_MODEL_SIZE
+    backend = backend or WHISPER_BACKEND
+    device = device or WHISPER_DEVICE
+    compute_type = WHISPER_COMPUTE_TYPE if compute_type is None else compute_type
+    threads = WHISPER_THREADS if threads is None else threads
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown Whisper backend {backend!r}; choose from {sorted(BACKENDS)}")
+
+    key = ("transcriber", backend, size, device, compute_type, threads)
+    return registry.get_or_load(key, lambda: BACKENDS[backend](size, device, compute_type, threads))
+
+
+def model_id(size=None, backend=None):
+    """Short name of the configured model, e.g. ``faster/base``, for cache keys."""
+    return f"{backend or WHISPER_BACKEND}/{size or WHISPER_MODEL_SIZE}"
+
+
+def warm_up_async(**config):
+    """Load and warm up a transcriber in the background; returns the thread."""
+    thread = threading.Thread(target=lambda: get_transcriber(**config).warm_up(), daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,230 @@
+import multiprocessing
+import os
+import threading
+import time
+
+import transcriber
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+TRANSCRIBE_WORKERS = int(os.environ.get("TRANSCRIBE_WORKERS", "2"))  # 0 = transcribe in-process
+TRANSCRIBE_QUEUE_TIMEOUT = float(os.environ.get("TRANSCRIBE_QUEUE_TIMEOUT", "30"))  # wait for a free worker
+TRANSCRIBE_TIMEOUT = float(os.environ.get("TRANSCRIBE_TIMEOUT", "120"))  # one transcription
+HEALTH_CHECK_INTERVAL = float(os.environ.get("TRANSCRIBE_HEALTH_INTERVAL", "10"))
+PING_TIMEOUT = 5
+
+
+class PoolBusyError(Exception):
+    """No worker became free within the queue timeout."""
+
+
+class WorkerCrashedError(Exception):
+    """The worker died or hung mid-request; it has been restarted."""
+
+
+def _worker_main(conn, config):
+    """Worker process: preload the model, then serve requests from ``conn`` until EOF."""
+    model = transcriber.get_transcriber(**config)
+    model.warm_up()
+    conn.send(("ready", os.getpid()))
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        kind, payload = message
+        if kind == "ping":
+            conn.send(("pong", None))
+            continue
+        audio, options = payload
+        try:
+            if kind == "transcribe_batch":
+                conn.send(("ok", model.transcribe_batch(audio, **options)))
+            else:
+                conn.send(("ok", model.transcribe(audio, **options)))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+class _Worker:
+    def __init__(self, index, context, config):
+        self.index = index
+        self.context = context
+        self.config = config
+        self.busy = False
+        self.restarts = -1
+        self.process = None
+        self.conn = None
+        self.start()
+
+    def start(self):
+        self.stop()
+        parent, child = self.context.Pipe()
+        self.process = self.context.Process(target=_worker_main, args=(child, self.config),
+                                            name=f"whisper-worker-{self.index}", daemon=True)
+        self.process.start()
+        child.close()
+        self.conn = parent
+        self.restarts += 1
+        self.ready = False
+
+    def stop(self):
+        if self.conn is not None:
+            self.conn.close()
+        if self.process is not None and self.process.is_alive():
+            self.process.terminate()
+            self.process.join(5)
+
+    def _recv(self, timeout):
+        """Next reply, skipping the startup ``ready`` message; raises on crash or timeout."""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self.conn.poll(remaining):
+                raise WorkerCrashedError(f"worker {self.index} did not answer within {timeout:.0f}s")
+            try:
+                kind, payload = self.conn.recv()
+            except (EOFError, OSError):
+                self.process.join(1)
+                raise WorkerCrashedError(f"worker {self.index} exited "
+                                         f"(code {self.process.exitcode})")
+            if kind == "ready":
+                self.ready = True
+                continue
+            return kind, payload
+
+    def check_ready(self):
+        """Pick up the startup ``ready`` message without blocking."""
+        while not self.ready and self.conn.poll(0):
+            kind, _ = self.conn.recv()
+            self.ready = kind == "ready"
+        return self.ready
+
+    def request(self, message, timeout):
+        try:
+            self.conn.send(message)
+        except (BrokenPipeError, OSError):
+            raise WorkerCrashedError(f"worker {self.index} is gone")
+        return self._recv(timeout)
+
+
+class TranscriptionPool:
+    """N worker processes, each holding its own preloaded Whisper model.
+
+    Every process has its own interpreter (and GIL), so concurrent requests
+    transcribe in parallel across cores. ``transcribe`` has the same
+    signature as ``Transcriber.transcribe``: the calling thread checks out an
+    idle worker, sends it the audio over a pipe and blocks for the result;
+    ``transcribe_batch`` sends a whole batch of windows to one worker the same
+    way. At most ``workers`` transcriptions run at once; further callers wait
+    up to ``queue_timeout`` seconds and then get ``PoolBusyError``.
+
+    A worker that dies or hangs is restarted, both when a request notices and
+    from a background health check that pings idle workers.
+    """
+
+    def __init__(self, workers=TRANSCRIBE_WORKERS, queue_timeout=TRANSCRIBE_QUEUE_TIMEOUT,
+                 timeout=TRANSCRIBE_TIMEOUT, health_interval=HEALTH_CHECK_INTERVAL, **config):
+        self.queue_timeout = queue_timeout
+        self.timeout = timeout
+        if not config.get("threads") and not transcriber.WHISPER_THREADS:
+            # Split the cores between workers instead of each one grabbing all of them
+            config["threads"] = max(1, (os.cpu_count() or 1) // workers)
+        # spawn: forking a process that already holds torch/CTranslate2 state is unsafe
+        context = multiprocessing.get_context("spawn")
+        self._workers = [_Worker(i, context, config) for i in range(workers)]
+        self._lock = threading.Lock()
+        self._free = threading.Semaphore(workers)
+        self.waiting = 0  # callers blocked on a free worker (queue depth)
+        self._closed = threading.Event()
+        self._monitor = threading.Thread(target=self._health_loop, args=(health_interval,),
+                                         name="whisper-pool-health", daemon=True)
+        self._monitor.start()
+
+    def _checkout(self, timeout):
+        with self._lock:
+            self.waiting += 1
+        try:
+            acquired = self._free.acquire(timeout=timeout)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+        if not acquired:
+            return None
+        with self._lock:
+            worker = next(w for w in self._workers if not w.busy)
+            worker.busy = True
+            return worker
+
+    def _checkin(self, worker):
+        with self._lock:
+            worker.busy = False
+        self._free.release()
+
+    def transcribe(self, audio, language=None, **options):
+        return self._call("transcribe", audio, dict(options, language=language), self.timeout)
+
+    def transcribe_batch(self, windows, language=None, **options):
+        """Same as ``Transcriber.transcribe_batch``, on one worker; the timeout scales with the batch."""
+        return self._call("transcribe_batch", list(windows), dict(options, language=language),
+                          self.timeout * max(1, len(windows)))
+
+    def _call(self, kind, audio, options, timeout):
+        worker = self._checkout(self.queue_timeout)
+        if worker is None:
+            raise PoolBusyError(f"all {len(self._workers)} transcription workers are busy")
+        try:
+            if not worker.process.is_alive():
+                worker.start()
+            # The first request to a fresh worker also waits for the model load
+            kind, payload = worker.request((kind, (audio, options)), timeout)
+        except WorkerCrashedError:
+            worker.start()
+            raise
+        finally:
+            self._checkin(worker)
+        if kind == "error":
+            raise RuntimeError(payload)
+        return payload
+
+    def _health_loop(self, interval):
+        while not self._closed.wait(interval):
+            for worker in self._workers:
+                # Only idle workers are checked, and each check holds a slot
+                # so requests never find every worker taken
+                if not self._free.acquire(blocking=False):
+                    break
+                with self._lock:
+                    idle = not worker.busy
+                    worker.busy = True
+                if not idle:
+                    self._free.release()
+                    continue
+                try:
+                    if not worker.process.is_alive():
+                        print(f"⚠️ Whisper worker {worker.index} died; restarting")
+                        worker.start()
+                    elif worker.check_ready():
+                        worker.request(("ping", None), PING_TIMEOUT)
+                except (WorkerCrashedError, EOFError, OSError) as e:
+                    print(f"⚠️ Whisper worker {worker.index} failed its health check ({e}); restarting")
+                    worker.start()
+                finally:
+                    self._checkin(worker)
+
+    @property
+    def busy(self):
+        with self._lock:
+            return sum(w.busy for w in self._workers)
+
+    def stats(self):
+        with self._lock:
+            return [{"worker": w.index, "pid": w.process.pid, "alive": w.process.is_alive(),
+                     "ready": w.ready, "busy": w.busy, "restarts": w.restarts}
+                    for w in self._workers]
+
+    def close(self):
+        self._closed.set()
+        for worker in self._workers:
+            worker.stop()
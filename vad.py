@@ -0,0 +1,230 @@
+from collections import namedtuple
+
+import numpy as np
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+FRAME_MS = 30
+MIN_SPEECH_MS = 250   # shorter bursts (clicks, taps) are ignored
+SPEECH_PAD_MS = 150   # audio kept either side of a segment
+HANGOVER_MS = 600     # trailing silence that ends an utterance
+MAX_UTTERANCE_S = 15  # long monologues are cut here
+ONSET_MS = 60         # consecutive speech needed to open an utterance
+
+
+class SpeechSegment(namedtuple("SpeechSegment", "start_sample end_sample sample_rate")):
+    """A detected stretch of speech, in absolute samples of the capture clock."""
+
+    @property
+    def start(self):
+        return self.start_sample / self.sample_rate
+
+    @property
+    def end(self):
+        return self.end_sample / self.sample_rate
+
+    @property
+    def duration(self):
+        return (self.end_sample - self.start_sample) / self.sample_rate
+
+
+# -------------------------------
+# FRAME CLASSIFIERS
+# -------------------------------
+class EnergyZcrVad:
+    """Baseline VAD: frame energy against an adaptive noise floor, gated by zero-crossing rate.
+
+    Broadband noise (fans, hiss) has a zero-crossing rate close to 0.5, while
+    voiced speech sits far below it, so high-ZCR frames are rejected even when
+    they are loud.
+    """
+
+    def __init__(self, sample_rate=16000, frame_ms=FRAME_MS, min_energy=0.01,
+                 energy_ratio=3.0, max_zcr=0.45, noise_adapt=0.05):
+        self.sample_rate = sample_rate
+        self.frame_samples = int(sample_rate * frame_ms / 1000)
+        self.min_energy = min_energy
+        self.energy_ratio = energy_ratio
+        self.max_zcr = max_zcr
+        self.noise_adapt = noise_adapt
+        self.noise_floor = min_energy / energy_ratio
+
+    def is_speech(self, frame):
+        x = frame.astype(np.float32) / 32768.0
+        energy = float(np.sqrt(np.mean(x * x)))
+        signs = np.signbit(x)
+        zcr = np.count_nonzero(signs[1:] != signs[:-1]) / len(x)
+
+        threshold = max(self.min_energy, self.noise_floor * self.energy_ratio)
+        speech = energy > threshold and zcr < self.max_zcr
+        if not speech:
+            # Track the background level; drop quickly, rise slowly
+            if energy < self.noise_floor:
+                self.noise_floor = energy
+            else:
+                self.noise_floor += self.noise_adapt * (energy - self.noise_floor)
+            self.noise_floor = max(self.noise_floor, 1e-4)
+        return speech
+
+
+class WebRtcVad:
+    """Google's WebRTC VAD (``pip install webrtcvad``)."""
+
+    def __init__(self, sample_rate=16000, frame_ms=FRAME_MS, aggressiveness=2):
+        import webrtcvad
+
+        if frame_ms not in (10, 20, 30):
+            raise ValueError("webrtcvad needs 10, 20 or 30 ms frames")
+        self.sample_rate = sample_rate
+        self.frame_samples = int(sample_rate * frame_ms / 1000)
+        self._vad = webrtcvad.Vad(aggressiveness)
+
+    def is_speech(self, frame):
+        return self._vad.is_speech(frame.astype(np.int16).tobytes(), self.sample_rate)
+
+
+class SileroVad:
+    """Silero VAD via torch.hub (needs torch; downloads the model on first use)."""
+
+    def __init__(self, sample_rate=16000, threshold=0.5):
+        import torch
+
+        if sample_rate not in (8000, 16000):
+            raise ValueError("Silero VAD supports 8 kHz and 16 kHz only")
+        self._torch = torch
+        self._model, _ = torch.hub.load("snakers4/silero-vad", "silero_vad", trust_repo=True)
+        self.sample_rate = sample_rate
+        # Silero's streaming model takes fixed 32 ms windows
+        self.frame_samples = 512 if sample_rate == 16000 else 256
+        self.threshold = threshold
+
+    def is_speech(self, frame):
+        x = self._torch.from_numpy(frame.astype(np.float32) / 32768.0)
+        with self._torch.no_grad():
+            return self._model(x, self.sample_rate).item() >= self.threshold
+
+
+VAD_BACKENDS = {
+    "energy": EnergyZcrVad,
+    "webrtc": WebRtcVad,
+    "silero": SileroVad,
+}
+
+
+def create_vad(backend="energy", sample_rate=16000, **kwargs):
+    """Build a frame classifier, falling back to the energy VAD if a backend can't load."""
+    if backend not in VAD_BACKENDS:
+        raise ValueError(f"Unknown VAD backend {backend!r}; choose from {sorted(VAD_BACKENDS)}")
+    try:
+        return VAD_BACKENDS[backend](sample_rate=sample_rate, **kwargs)
+    except ImportError as e:
+        print(f"⚠️ {backend} VAD unavailable ({e}), using energy VAD")
+        return EnergyZcrVad(sample_rate=sample_rate)
+
+
+# -------------------------------
+# ENDPOINTER
+# -------------------------------
+class Endpointer:
+    """Streaming utterance endpointer.
+
+    Feeds captured audio through a VAD frame by frame and closes an utterance
+    as soon as ``hangover_ms`` of trailing silence follows it, so transcription
+    starts when the speaker stops rather than on a fixed window. Utterances
+    longer than ``max_utterance_s`` are cut and a new one starts immediately.
+    """
+
+    def __init__(self, vad, hangover_ms=HANGOVER_MS, max_utterance_s=MAX_UTTERANCE_S,
+                 min_speech_ms=MIN_SPEECH_MS, onset_ms=ONSET_MS, pad_ms=SPEECH_PAD_MS):
+        self.vad = vad
+        self.sample_rate = vad.sample_rate
+        self.frame_samples = vad.frame_samples
+        frames = lambda ms: max(1, round(ms * self.sample_rate / 1000 / self.frame_samples))
+        self.hangover_frames = frames(hangover_ms)
+        self.min_speech_frames = frames(min_speech_ms)
+        self.onset_frames = frames(onset_ms)
+        self.max_utterance_samples = int(max_utterance_s * self.sample_rate)
+        self.pad_samples = int(pad_ms * self.sample_rate / 1000)
+
+        self._pending = np.zeros(0, dtype=np.int16)
+        self.position = 0
+        self._reset()
+
+    def _reset(self):
+        self.in_speech = False
+        self.utterance_start = None
+        self._onset_run = 0
+        self._silence_run = 0
+        self._speech_frames = 0
+        self._last_speech_end = None
+
+    def _close(self, end_sample):
+        segment = None
+        if self._speech_frames >= self.min_speech_frames:
+            segment = SpeechSegment(self.utterance_start, end_sample, self.sample_rate)
+        self._reset()
+        return segment
+
+    def update(self, samples, end_position):
+        """Consume new audio ending at absolute sample ``end_position``.
+
+        Returns the list of utterances that finished within it.
+        """
+        samples = np.asarray(samples).reshape(-1)
+        start_position = end_position - len(samples)
+        finished = []
+        if start_position != self.position:
+            # Audio was dropped upstream; close what we have and resync
+            if self.in_speech:
+                segment = self._close(self._last_speech_end + self.pad_samples)
+                if segment:
+                    finished.append(segment)
+            self._reset()
+            self._pending = np.zeros(0, dtype=np.int16)
+        self.position = end_position
+
+        if len(self._pending):
+            samples = np.concatenate((self._pending, samples))
+        fs = self.frame_samples
+        base = end_position - len(samples)
+        n_frames = len(samples) // fs
+
+        for i in range(n_frames):
+            frame_start = base + i * fs
+            frame_end = frame_start + fs
+            speech = self.vad.is_speech(samples[i * fs:(i + 1) * fs])
+
+            if not self.in_speech:
+                self._onset_run = self._onset_run + 1 if speech else 0
+                if self._onset_run >= self.onset_frames:
+                    onset = frame_end - self._onset_run * fs
+                    self.in_speech = True
+                    self.utterance_start = max(0, onset - self.pad_samples)
+                    self._speech_frames = self._onset_run
+                    self._last_speech_end = frame_end
+                continue
+
+            if speech:
+                self._speech_frames += 1
+                self._silence_run = 0
+                self._last_speech_end = frame_end
+            else:
+                self._silence_run += 1
+                if self._silence_run >= self.hangover_frames:
+                    segment = self._close(min(frame_end, self._last_speech_end + self.pad_samples))
+                    if segment:
+                        finished.append(segment)
+                    continue
+
+            if frame_end - self.utterance_start >= self.max_utterance_samples:
+                segment = self._close(frame_end)
+                if segment:
+                    finished.append(segment)
+                # Speaker is still talking; carry on straight into the next utterance
+                self.in_speech = True
+                self.utterance_start = frame_end
+                self._last_speech_end = frame_end
+
+        self._pending = samples[n_frames * fs:].copy()
+        return finished
@@ -0,0 +1,68 @@
+import os
+import threading
+from collections import OrderedDict
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+MAX_LOADED_MODELS = int(os.environ.get("WHISPER_MAX_LOADED_MODELS", "2"))
+
+
+class WhisperModelRegistry:
+    """Process-wide cache of loaded Whisper models.
+
+    Each key passed to ``get_or_load`` - a transcriber backend configuration -
+    is loaded at most once and shared by every caller. When more than
+    ``max_models`` are resident the least recently used one is evicted.
+    """
+
+    def __init__(self, max_models=MAX_LOADED_MODELS):
+        self.max_models = max(1, max_models)
+        self._models = OrderedDict()
+        self._loading = {}
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key, loader):
+        """Return the model cached under ``key``, calling ``loader()`` on first use."""
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                return model
+            # Another thread may already be loading this key; wait on it
+            # instead of deserializing the same weights twice.
+            event = self._loading.get(key)
+            owner = event is None
+            if owner:
+                event = threading.Event()
+                self._loading[key] = event
+
+        if not owner:
+            event.wait()
+            with self._lock:
+                model = self._models.get(key)
+            if model is None:
+                # The loading thread failed; retry ourselves
+                return self.get_or_load(key, loader)
+            return model
+
+        try:
+            model = loader()
+            with self._lock:
+                self._models[key] = model
+                self._models.move_to_end(key)
+                while len(self._models) > self.max_models:
+                    evicted, _ = self._models.popitem(last=False)
+                    print(f"♻️ Evicted Whisper model {evicted}")
+            return model
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+            event.set()
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+
+registry = WhisperModelRegistry()